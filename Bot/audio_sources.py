@@ -0,0 +1,224 @@
+# In-memory audio sources
+# Plays audio the bot already holds in memory straight to a voice client, with no FFmpeg process:
+# 48kHz stereo PCM buffers, or Opus frames encoded once up front so repeat plays skip encoding too.
+# SoundLibrary keeps named clips (generated tones, sound effects, soundboard files) ready to play.
+# NumPy is only imported when a WAV file has to be converted.
+import asyncio, os, subprocess, wave
+
+import discord
+
+# One 20ms frame of 48kHz 16-bit stereo PCM
+FRAME_SIZE = discord.opus.Encoder.FRAME_SIZE
+SAMPLES_PER_FRAME = discord.opus.Encoder.SAMPLES_PER_FRAME
+SAMPLE_RATE = discord.opus.Encoder.SAMPLING_RATE
+CHANNELS = discord.opus.Encoder.CHANNELS
+
+
+class PCMBufferAudio(discord.AudioSource):
+    """
+    AudioSource over a buffer of 48kHz 16-bit stereo PCM (e.g. from tones.tone_pcm).
+    The buffer is shared, not copied, so one cached clip can back any number of players.
+    """
+
+    def __init__(self, pcm):
+        self._pcm = memoryview(pcm)
+        self._position = 0
+
+    def read(self):
+        frame = self._pcm[self._position:self._position + FRAME_SIZE]
+        self._position += FRAME_SIZE
+        if not frame:
+            return b''
+        if len(frame) < FRAME_SIZE:
+            # Pad the last partial frame with silence
+            return bytes(frame) + b'\x00' * (FRAME_SIZE - len(frame))
+        return bytes(frame)
+
+    def is_opus(self):
+        return False
+
+
+class OpusFramesAudio(discord.AudioSource):
+    """AudioSource over pre-encoded 20ms Opus frames; the voice client sends them without encoding."""
+
+    def __init__(self, frames):
+        self._frames = frames
+        self._index = 0
+
+    def read(self):
+        if self._index >= len(self._frames):
+            return b''
+        frame = self._frames[self._index]
+        self._index += 1
+        return frame
+
+    def is_opus(self):
+        return True
+
+
+def pad_to_frames(pcm):
+    """Pad PCM with silence to a whole number of frames."""
+    remainder = len(pcm) % FRAME_SIZE
+    return pcm + b'\x00' * (FRAME_SIZE - remainder) if remainder else pcm
+
+
+def encode_opus(pcm, bitrate=128):
+    """
+    Encode 48kHz stereo PCM into Opus frames.
+    Raises discord.opus.OpusNotLoaded if libopus isn't available.
+    """
+    encoder = discord.opus.Encoder(bitrate=bitrate)
+    pcm = pad_to_frames(pcm)
+    return tuple(
+        encoder.encode(pcm[offset:offset + FRAME_SIZE], SAMPLES_PER_FRAME)
+        for offset in range(0, len(pcm), FRAME_SIZE)
+    )
+
+
+def convert_pcm16(samples, sample_rate, channels):
+    """Resample interleaved 16-bit samples (a NumPy array) to 48kHz stereo PCM bytes."""
+    import numpy as np
+    frames = samples.reshape(-1, channels).astype(np.float64)
+    if channels == 1:
+        frames = np.repeat(frames, 2, axis=1)
+    elif channels > 2:
+        frames = frames[:, :2]
+    if sample_rate != SAMPLE_RATE and len(frames):
+        # Linear interpolation is plenty for short effects
+        count = int(round(len(frames) * SAMPLE_RATE / sample_rate))
+        source_times = np.arange(len(frames)) / sample_rate
+        target_times = np.arange(count) / SAMPLE_RATE
+        frames = np.column_stack([np.interp(target_times, source_times, frames[:, c]) for c in range(2)])
+    return np.clip(np.round(frames), -32768, 32767).astype('<i2').tobytes()
+
+
+def load_pcm(path, ffmpeg="ffmpeg"):
+    """
+    Decode an audio file to 48kHz stereo PCM.
+    16-bit WAV files are converted in-process; anything else is decoded once with FFmpeg.
+    """
+    if path.lower().endswith('.wav'):
+        with wave.open(path, 'rb') as wav_file:
+            if wav_file.getsampwidth() == 2:
+                import numpy as np
+                samples = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype='<i2')
+                return convert_pcm16(samples, wav_file.getframerate(), wav_file.getnchannels())
+
+    result = subprocess.run(
+        [ffmpeg, "-v", "error", "-i", path, "-f", "s16le", "-ar", str(SAMPLE_RATE), "-ac", str(CHANNELS), "pipe:1"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True
+    )
+    return result.stdout
+
+
+class SoundClip:
+    """A decoded clip that can be played any number of times at once."""
+
+    __slots__ = ('name', 'pcm', 'opus_frames')
+
+    def __init__(self, name, pcm, opus_frames=None):
+        self.name = name
+        self.pcm = pcm
+        self.opus_frames = opus_frames
+
+    @property
+    def duration(self):
+        return len(self.pcm) / (SAMPLE_RATE * CHANNELS * 2)
+
+    def source(self):
+        """A fresh AudioSource for one playback (Opus frames when available, PCM otherwise)."""
+        if self.opus_frames is not None:
+            return OpusFramesAudio(self.opus_frames)
+        return PCMBufferAudio(self.pcm)
+
+
+class SoundLibrary:
+    """
+    Named sound clips decoded once and kept in memory.
+
+    Args:
+        directory: Optional folder of sound files; a clip named "airhorn" is loaded from airhorn.<ext>
+        ffmpeg: FFmpeg executable used to decode non-WAV files
+        pre_encode: Encode clips to Opus once when libopus is available, so playback skips encoding
+    """
+
+    EXTENSIONS = ('.wav', '.ogg', '.opus', '.mp3', '.flac', '.m4a')
+
+    def __init__(self, directory=None, ffmpeg="ffmpeg", pre_encode=True):
+        self.directory = directory
+        self.ffmpeg = ffmpeg
+        self.pre_encode = pre_encode
+        self._clips = {}
+        self._generators = {}
+        self._loading = {}
+
+    def register(self, name, pcm):
+        """
+        Add a clip from 48kHz stereo PCM bytes, or from a function returning them
+        (called on first use, so generated sounds cost nothing until they're played).
+        """
+        self._clips.pop(name, None)
+        self._generators.pop(name, None)
+        if callable(pcm):
+            self._generators[name] = pcm
+        else:
+            self._clips[name] = self._make_clip(name, pcm)
+
+    def names(self):
+        """Clip names that can be played (registered clips plus files in the sound folder)."""
+        names = set(self._clips) | set(self._generators)
+        if self.directory and os.path.isdir(self.directory):
+            for filename in os.listdir(self.directory):
+                stem, ext = os.path.splitext(filename)
+                if ext.lower() in self.EXTENSIONS:
+                    names.add(stem)
+        return sorted(names)
+
+    def _make_clip(self, name, pcm):
+        opus_frames = None
+        if self.pre_encode:
+            try:
+                opus_frames = encode_opus(pcm)
+            except discord.opus.OpusNotLoaded:
+                # No libopus: play the PCM and let the voice client encode it
+                pass
+        return SoundClip(name, pcm, opus_frames)
+
+    def _find_file(self, name):
+        # Names come from users; never let one reach outside the sound folder
+        if not self.directory or not name or os.path.basename(name) != name or name.startswith('.'):
+            return None
+        for ext in self.EXTENSIONS:
+            path = os.path.join(self.directory, name + ext)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def _load_sync(self, name):
+        generator = self._generators.get(name)
+        if generator is not None:
+            return self._make_clip(name, generator())
+        path = self._find_file(name)
+        if path is None:
+            raise KeyError(f"Unknown sound: {name}")
+        return self._make_clip(name, load_pcm(path, self.ffmpeg))
+
+    async def get(self, name):
+        """Load (on first use) and return a clip; raises KeyError for unknown names."""
+        clip = self._clips.get(name)
+        if clip is not None:
+            return clip
+
+        task = self._loading.get(name)
+        if task is None:
+            # Decoding and encoding are CPU work; keep them off the event loop
+            loop = asyncio.get_running_loop()
+            task = self._loading[name] = asyncio.ensure_future(loop.run_in_executor(None, self._load_sync, name))
+            task.add_done_callback(lambda _: self._loading.pop(name, None))
+        clip = await asyncio.shield(task)
+        self._clips[name] = clip
+        return clip
+
+    async def source(self, name):
+        """A fresh AudioSource for a named clip."""
+        return (await self.get(name)).source()
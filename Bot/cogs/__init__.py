@@ -0,0 +1,29 @@
+# Command groups
+# Each group is a discord.py extension (cogs.<group>) loaded in setup_hook. Groups only import
+# their heavy dependencies (yt-dlp, Pillow, replicate, ...) the first time a command needs them,
+# and groups listed in DISABLED_GROUPS aren't imported at all.
+
+# Group -> the slash commands it adds, so a disabled group's commands are known without importing it
+COMMAND_GROUPS = {
+    'fun': ('eightball', 'joke', 'fact', 'wordofday', 'reverse', 'mock'),
+    'utility': ('poll', 'pollresults', 'countdown'),
+    'reminders': ('remind', 'reminders', 'cancelreminder'),
+    'lookup': ('search', 'weather', 'urban', 'translate'),
+    'images': ('imagine', 'gif', 'meme', 'memegen', 'qrcode'),
+    'moderation': ('permamute', 'unpermamute'),
+    'soundboard': ('screechkick', 'sfx'),
+    'music': ('play', 'pause', 'resume', 'skip', 'queue', 'remove', 'move', 'shuffle', 'loop', 'stop', 'leave'),
+}
+
+
+def enabled_groups(disabled_groups=()):
+    """Groups to load, in the order above; raises ValueError for unknown names in disabled_groups."""
+    unknown = set(disabled_groups) - set(COMMAND_GROUPS)
+    if unknown:
+        raise ValueError(f"Unknown command groups: {', '.join(sorted(unknown))}")
+    return [group for group in COMMAND_GROUPS if group not in disabled_groups]
+
+
+def group_commands(groups):
+    """Every slash command the given groups add."""
+    return {name for group in groups for name in COMMAND_GROUPS[group]}
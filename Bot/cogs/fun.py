@@ -0,0 +1,231 @@
+# Fun commands
+# /eightball, /joke, /fact, /wordofday, /reverse and /mock. Canned answers come from the content
+# packs in Bot/content/.
+import os, random
+from datetime import datetime
+
+from discord import app_commands, Embed
+from discord.ext import commands
+
+import config
+from content_packs import ContentLibrary
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'content')
+
+
+class Fun(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        # Loaded into memory when the group loads; edited files (and per-guild overrides) are picked up in the background
+        self.content = ContentLibrary(
+            CONTENT_DIR,
+            override_dir=getattr(config, 'CONTENT_OVERRIDE_DIR', os.path.join(CONTENT_DIR, 'guilds')),
+            check_interval=getattr(config, 'CONTENT_RELOAD_INTERVAL', 30)
+        )
+        self.content.register('eightball')
+        self.content.register('facts')
+        self.content.register('words', fields=3)
+        self.content.register('wordofday_tips')
+
+    async def cog_load(self):
+        self.content.start()
+        self.bot.metrics.add_stats('content', self.content.stats)
+
+    async def cog_unload(self):
+        self.bot.metrics.remove_stats('content')
+        await self.content.close()
+
+    ####################################### Magic 8Ball Command ###################################
+    @app_commands.command(name = "eightball", description = "Magic eightball")
+    async def eightball_command(self, interaction, question: str):
+        response = self.content.choice('eightball', interaction.guild_id)
+        await interaction.response.send_message(f"Question: {question}\nMagic 8-Ball says: {response}")
+
+    ############################################# Joke Command ########################################################
+    @app_commands.command(name="joke", description="Get a random joke")
+    async def joke(self, interaction):
+        await interaction.response.defer()
+
+        try:
+            # Choose a random joke API
+            apis = [
+                "https://official-joke-api.appspot.com/random_joke",
+                "https://v2.jokeapi.dev/joke/Any?safe-mode",
+                "https://icanhazdadjoke.com/"
+            ]
+
+            api_url = random.choice(apis)
+            headers = {"Accept": "application/json"}
+
+            status, data = await self.bot.http_client.get_json(api_url, headers=headers)
+            if status != 200 or not data:
+                await interaction.followup.send("❌ Couldn't fetch a joke at the moment.")
+                return
+
+            # Format joke based on API
+            if api_url == "https://official-joke-api.appspot.com/random_joke":
+                joke_text = f"**{data['setup']}**\n\n{data['punchline']}"
+            elif api_url == "https://v2.jokeapi.dev/joke/Any?safe-mode":
+                if data["type"] == "single":
+                    joke_text = data["joke"]
+                else:
+                    joke_text = f"**{data['setup']}**\n\n{data['delivery']}"
+            else:  # icanhazdadjoke
+                joke_text = data["joke"]
+
+            embed = Embed(
+                title="Here's a joke for you!",
+                description=joke_text,
+                color=0xf1c40f
+            )
+            embed.set_footer(text="😂")
+
+            await interaction.followup.send(embed=embed)
+
+        except Exception as e:
+            print(f"Joke error: {str(e)}")
+            self.bot.metrics.command_error(interaction, e)
+            await interaction.followup.send(f"❌ Error fetching joke: {str(e)}")
+
+    ############################################# Word of the Day Command ########################################################
+    @app_commands.command(name="wordofday", description="Get the word of the day")
+    async def wordofday(self, interaction):
+        await interaction.response.defer()
+
+        try:
+            # Try multiple APIs with fallback options
+            apis = [
+                "https://random-words-api.vercel.app/word",
+                "https://api.dictionaryapi.dev/api/v2/entries/en/",
+                "https://www.wordnik.com/words/"
+            ]
+
+            # First attempt: Random Words API (one word per calendar day, so it really is the word of the day)
+            try:
+                status, data = await self.bot.response_cache.get_or_fetch(
+                    'wordofday', [datetime.now().strftime('%Y-%m-%d')],
+                    lambda: self.bot.http_client.get_json(apis[0]),
+                    should_cache=lambda result: result[0] == 200 and bool(result[1])
+                )
+                if status == 200 and data:
+                    word = data[0]["word"]
+                    definition = data[0]["definition"]
+                    pronunciation = data[0].get("pronunciation", "")
+
+                    embed = Embed(
+                        title=f"📚 Word of the Day: {word}",
+                        color=0x1abc9c
+                    )
+
+                    if pronunciation:
+                        embed.add_field(name="Pronunciation", value=pronunciation, inline=False)
+
+                    embed.add_field(name="Definition", value=definition, inline=False)
+                    embed.set_footer(text="Expand your vocabulary every day!")
+
+                    await interaction.followup.send(embed=embed)
+                    return
+            except Exception as e:
+                print(f"First API failed: {str(e)}")
+
+            # Fallback: a random word from the words content pack
+            word, pos, definition = self.content.choice('words', interaction.guild_id)
+
+            embed = Embed(
+                title=f"📚 Word of the Day: {word}",
+                color=0x1abc9c
+            )
+
+            embed.add_field(name="Part of Speech", value=pos, inline=True)
+            embed.add_field(name="Definition", value=definition, inline=False)
+
+            # Add a fun fact about using the word
+            embed.set_footer(text=self.content.choice('wordofday_tips', interaction.guild_id))
+
+            await interaction.followup.send(embed=embed)
+
+        except Exception as e:
+            print(f"Word of the day error: {str(e)}")
+            self.bot.metrics.command_error(interaction, e)
+            await interaction.followup.send(f"❌ Error fetching word of the day: {str(e)}")
+
+    ############################################# Reverse Command ########################################################
+    @app_commands.command(name="reverse", description="Reverse someone's text because why not")
+    async def reverse(self, interaction, text: str):
+        """Reverses the given text and sends it back — surprisingly annoying."""
+        reversed_text = text[::-1]
+
+        # Zero-width characters sprinkled in so it can't be easily copy-pasted back
+        trolled = "\u200b".join(reversed_text)
+
+        embed = Embed(
+            title="🔄 REVERSED",
+            description=trolled,
+            color=0xff6961
+        )
+        embed.set_footer(text=f"Original: {text}")
+        await interaction.response.send_message(embed=embed)
+
+    ############################################# Mock Command ##########################################################
+    @app_commands.command(name="mock", description="mOcK sOmEoNe'S tExT")
+    async def mock(self, interaction, text: str):
+        """Converts text to SpOnGeBoB mOcKiNg CaSe for maximum disrespect."""
+        mocked = "".join(
+            char.upper() if i % 2 else char.lower()
+            for i, char in enumerate(text)
+        )
+
+        embed = Embed(
+            description=mocked,
+            color=0xf4d03f
+        )
+        embed.set_thumbnail(url="https://i.imgflip.com/1otk96.jpg")
+        embed.set_footer(text=f"— {interaction.user.display_name} is mocking someone")
+        await interaction.response.send_message(embed=embed)
+
+    ############################################# Random Fact Command ########################################################
+    @app_commands.command(name="fact", description="Get a random interesting fact")
+    async def fact(self, interaction):
+        """Get a random fact"""
+        await interaction.response.defer()
+
+        try:
+            # Try multiple fact APIs
+            apis = [
+                "https://uselessfacts.jsph.pl/random.json?language=en",
+                "https://api.api-ninjas.com/v1/facts",
+            ]
+
+            # Try first API
+            try:
+                status, data = await self.bot.http_client.get_json(apis[0])
+                if status == 200 and data:
+                    fact_text = data.get('text', '')
+
+                    embed = Embed(
+                        title="💡 Random Fact",
+                        description=fact_text,
+                        color=0x3498db
+                    )
+                    await interaction.followup.send(embed=embed)
+                    return
+            except:
+                pass
+
+            # Fallback to the facts content pack
+            fact_text = self.content.choice('facts', interaction.guild_id)
+            embed = Embed(
+                title="💡 Random Fact",
+                description=fact_text,
+                color=0x3498db
+            )
+            await interaction.followup.send(embed=embed)
+
+        except Exception as e:
+            print(f"Fact error: {str(e)}")
+            self.bot.metrics.command_error(interaction, e)
+            await interaction.followup.send(f"❌ Error fetching fact: {str(e)}")
+
+
+async def setup(bot):
+    await bot.add_cog(Fun(bot), **bot.command_scope)
@@ -0,0 +1,242 @@
+# Image commands
+# /imagine, /gif, /meme, /memegen and /qrcode. Rendering runs in the render pool, and the
+# Replicate and Giphy clients are only imported once their commands are used.
+import random
+from io import BytesIO
+from typing import Optional
+
+import discord
+from discord import app_commands, Embed
+from discord.ext import commands
+
+import config
+from config import GIPHY_API_KEY, REPLICATE_API_KEY
+from image_jobs import ImageJobQueue, ReplicateBackend, FakeReplicateBackend, ImageQueueFull
+from meme_renderer import MemeRenderer, TemplateError
+from qr_renderer import QRCodeRenderRequest
+from render_pool import RenderPool, RenderError
+
+# Discord's attachment size limit for bots without boosts
+MAX_UPLOAD_BYTES = 8 * 1024 * 1024
+
+
+class Images(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        # CPU-bound image work (/memegen, /qrcode) runs in worker processes, off the gateway loop
+        self.render_pool = RenderPool(
+            max_workers=getattr(config, 'RENDER_WORKERS', None),
+            timeout=getattr(config, 'RENDER_TIMEOUT', 10),
+            max_pixels=getattr(config, 'RENDER_MAX_PIXELS', 4096 * 4096),
+            mode=getattr(config, 'RENDER_POOL_MODE', 'process')
+        )
+
+        # /memegen templates kept in memory, with finished memes cached by (template, top, bottom)
+        self.meme_renderer = MemeRenderer(
+            bot.http_client,
+            render_pool=self.render_pool,
+            max_templates=getattr(config, 'MEME_TEMPLATE_CACHE_SIZE', 16),
+            template_dir=getattr(config, 'MEME_TEMPLATE_DIR', None)
+        )
+
+        # /imagine jobs: async Replicate predictions behind a fair queue (IMAGE_BACKEND = 'fake' works offline)
+        if getattr(config, 'IMAGE_BACKEND', 'replicate') == 'fake':
+            image_backend = FakeReplicateBackend()
+        else:
+            image_backend = ReplicateBackend(
+                REPLICATE_API_KEY,
+                webhook_url=getattr(config, 'REPLICATE_WEBHOOK_URL', None),
+                metrics=bot.metrics
+            )
+        self.image_jobs = ImageJobQueue(
+            image_backend,
+            max_concurrent=getattr(config, 'IMAGINE_MAX_CONCURRENT', 2),
+            per_user_limit=getattr(config, 'IMAGINE_PER_USER', 1)
+        )
+
+    async def cog_load(self):
+        self.bot.metrics.add_stats('meme_renderer', self.meme_renderer.stats)
+        # Replicate's completion webhooks arrive on the metrics server (see REPLICATE_WEBHOOK_URL)
+        self.bot.metrics.add_webhook('replicate', self.image_jobs.backend.notify)
+
+    async def cog_unload(self):
+        self.bot.metrics.remove_stats('meme_renderer')
+        self.bot.metrics.remove_webhook('replicate')
+        self.render_pool.shutdown()
+
+    ######################################### Image Generator Command ##################################################
+    @app_commands.command(name="imagine", description="Generate an image")
+    async def imagine(self, interaction, prompt: str):
+        """Generate an image from a text prompt using Stable Diffusion 3 via Replicate."""
+        # Turn the user away before deferring, since followups after a public defer can't be ephemeral
+        if self.image_jobs.is_full(interaction.user.id):
+            await interaction.response.send_message(
+                f"❌ You already have {self.image_jobs.max_pending_per_user} images waiting — wait for those to finish first!",
+                ephemeral=True
+            )
+            return
+        await interaction.response.defer()
+        status_message = None
+
+        async def report_position(position):
+            # Keep one status message up to date as the job moves through the queue
+            nonlocal status_message
+            if position > 0:
+                content = f"🕒 Queued image for **{prompt}** — position #{position}"
+            else:
+                content = f"🎨 Generating image for: **{prompt}**"
+            if status_message is None:
+                status_message = await interaction.followup.send(content)
+            else:
+                await status_message.edit(content=content)
+
+        try:
+            # Runs as an async prediction, so the bot stays responsive while it generates
+            image_url = await self.image_jobs.submit(interaction.user.id, prompt, on_position=report_position)
+
+            # Download and send the image as a Discord file attachment
+            status, data = await self.bot.http_client.download(image_url, max_bytes=MAX_UPLOAD_BYTES, timeout=60)
+            if status != 200:
+                await interaction.followup.send(
+                    f"❌ Failed to download the generated image. (HTTP {status})"
+                )
+            elif data is None:
+                await interaction.followup.send(f"🖼️ The image is too big to upload, here's the link: {image_url}")
+            else:
+                file = discord.File(BytesIO(data), filename="generated.png")
+                await interaction.followup.send(file=file)
+
+        except ImageQueueFull as e:
+            # Only reached if the queue filled up while we were deferring
+            await interaction.followup.send(f"❌ {str(e)} — wait for those to finish first!")
+        except Exception as e:
+            print(f"Imagine command error: {str(e)}")
+            self.bot.metrics.command_error(interaction, e)
+            await interaction.followup.send(f"❌ An error occurred: {str(e)}")
+
+    ####################################### Meme/GIF Command ########################################################
+    @app_commands.command(name="gif", description="Search for a GIF")
+    async def gif(self, interaction, search_term: str):
+        await interaction.response.defer()
+
+        # giphy_client is imported the first time someone uses /gif
+        import giphy_client
+        from giphy_client.rest import ApiException
+
+        try:
+            # Create giphy instance
+            api_instance = giphy_client.DefaultApi()
+
+            # Search for GIF
+            with self.bot.metrics.time_upstream('api.giphy.com'):
+                api_response = api_instance.gifs_search_get(
+                    GIPHY_API_KEY,
+                    search_term,
+                    limit=5,
+                    rating='g'
+                )
+
+            if api_response.data:
+                # Get random GIF from results
+                gif_choice = random.choice(api_response.data)
+                gif_url = gif_choice.images.original.url
+
+                # Create embed
+                embed = Embed(title=f"GIF: {search_term}")
+                embed.set_image(url=gif_url)
+                embed.set_footer(text="Powered by GIPHY")
+
+                await interaction.followup.send(embed=embed)
+            else:
+                await interaction.followup.send(f"Couldn't find any GIFs for '{search_term}'")
+
+        except ApiException as e:
+            self.bot.metrics.command_error(interaction, e)
+            await interaction.followup.send(f"Error: {str(e)}")
+
+
+    @app_commands.command(name="meme", description="Get a random meme")
+    async def meme(self, interaction):
+        """Fetch a random meme from popular subreddits via meme-api.com."""
+        await interaction.response.defer()
+
+        subreddits = ['memes', 'dankmemes', 'wholesomememes']
+        subreddit = random.choice(subreddits)
+
+        try:
+            status, data = await self.bot.http_client.get_json(f'https://meme-api.com/gimme/{subreddit}')
+            if status == 200 and data:
+                # Skip NSFW/spoiler posts
+                if data.get('nsfw') or data.get('spoiler'):
+                    await interaction.followup.send("🔄 Got a spoiler/NSFW post — try again!")
+                    return
+
+                embed = Embed(title=data.get('title', 'Random Meme'))
+                embed.set_image(url=data['url'])
+                embed.set_footer(text=f"From r/{data.get('subreddit', subreddit)} • 👍 {data.get('ups', 0)}")
+
+                await interaction.followup.send(embed=embed)
+            else:
+                await interaction.followup.send("❌ Couldn't fetch a meme right now. Try again later!")
+
+        except Exception as e:
+            print(f"Meme command error: {str(e)}")
+            self.bot.metrics.command_error(interaction, e)
+            await interaction.followup.send(f"❌ Error fetching meme: {str(e)}")
+
+    ############################################# Meme Generator Command ########################################################
+    @app_commands.command(name="memegen", description="Generate a meme with custom text")
+    async def memegen(self, interaction, top_text: str, bottom_text: Optional[str] = None, template: Optional[str] = None):
+        """Generate a meme with custom text"""
+        await interaction.response.defer()
+
+        try:
+            # Templates, fonts and finished memes are cached by the renderer
+            png = await self.meme_renderer.render(template, top_text, bottom_text)
+            output = BytesIO(png)
+
+            # Send as file
+            file = discord.File(output, filename="meme.png")
+            await interaction.followup.send(file=file)
+
+        except TemplateError:
+            await interaction.followup.send("❌ Failed to load meme template.")
+        except RenderError as e:
+            await interaction.followup.send(f"❌ Couldn't render that meme: {str(e)}")
+        except Exception as e:
+            print(f"Meme generator error: {str(e)}")
+            self.bot.metrics.command_error(interaction, e)
+            await interaction.followup.send(f"❌ Error generating meme: {str(e)}")
+
+    ############################################# QR Code Generator Command ########################################################
+    @app_commands.command(name="qrcode", description="Generate a QR code from text")
+    async def qrcode_cmd(self, interaction, text: str):
+        """Generate QR code"""
+        await interaction.response.defer()
+
+        try:
+            # Build and encode the QR code in the render pool
+            png = await self.render_pool.render(QRCodeRenderRequest(text))
+            output = BytesIO(png)
+
+            # Send as file
+            file = discord.File(output, filename="qrcode.png")
+            embed = Embed(
+                title="📱 QR Code Generated",
+                description=f"**Content:** {text[:100]}",
+                color=0x000000
+            )
+            embed.set_image(url="attachment://qrcode.png")
+
+            await interaction.followup.send(embed=embed, file=file)
+
+        except RenderError as e:
+            await interaction.followup.send(f"❌ Couldn't render that QR code: {str(e)}")
+        except Exception as e:
+            print(f"QR code error: {str(e)}")
+            self.bot.metrics.command_error(interaction, e)
+            await interaction.followup.send(f"❌ Error generating QR code: {str(e)}")
+
+
+async def setup(bot):
+    await bot.add_cog(Images(bot), **bot.command_scope)
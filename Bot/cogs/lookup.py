@@ -0,0 +1,257 @@
+# Lookup commands
+# /search, /weather, /translate and /urban: third-party APIs behind the shared HTTP client and
+# response cache.
+import discord
+from discord import app_commands, Embed
+from discord.ext import commands
+
+import config
+from config import GOOGLE_API_KEY, GOOGLE_CSE_ID, OPENWEATHER_API_KEY
+from response_cache import normalize_key_part
+from search_service import SearchService
+from translation import TranslationService
+
+
+def format_search_results(query, result, page):
+    """Render one page of search results as a message."""
+    if not result['items']:
+        return f"No results found for '{query}'"
+
+    lines = ["**Search Results:**\n"]
+    for item in result['items']:
+        lines.append(f"**{item['title']}**")
+        lines.append(item['snippet'])
+        lines.append(f"🔗 {item['link']}\n")
+    lines.append(f"*Page {page + 1}*")
+    return "\n".join(lines)
+
+
+class SearchResultsView(discord.ui.View):
+    """Previous/Next buttons for /search. Pages already seen are kept so flipping back is free."""
+
+    def __init__(self, search_service, query, first_page):
+        super().__init__(timeout=180)
+        self.search_service = search_service
+        self.query = query
+        self.page = 0
+        self.pages = {0: first_page}
+        self.last_page = search_service.max_page(first_page['total'])
+        self._update_buttons()
+
+    def _update_buttons(self):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= self.last_page
+
+    async def _show(self, interaction, page):
+        await interaction.response.defer()
+        try:
+            if page not in self.pages:
+                self.pages[page] = await self.search_service.search(self.query, page)
+        except Exception as e:
+            await interaction.followup.send(f"Error performing search: {str(e)}", ephemeral=True)
+            return
+
+        self.page = page
+        self._update_buttons()
+        await interaction.edit_original_response(
+            content=format_search_results(self.query, self.pages[page], page), view=self
+        )
+
+    @discord.ui.button(label="Previous", emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction, button):
+        await self._show(interaction, self.page - 1)
+
+    @discord.ui.button(label="Next", emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction, button):
+        await self._show(interaction, self.page + 1)
+
+
+class Lookup(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        # Google Custom Search over the shared HTTP client, cached per query and page
+        self.search_service = SearchService(bot.http_client, GOOGLE_API_KEY, GOOGLE_CSE_ID, cache=bot.response_cache)
+        # /translate: translators reused per language, off the event loop, with concurrent requests batched
+        self.translation_service = TranslationService(
+            max_workers=getattr(config, 'TRANSLATE_WORKERS', 2),
+            cache_size=getattr(config, 'TRANSLATE_CACHE_SIZE', 2048),
+            batch_window=getattr(config, 'TRANSLATE_BATCH_WINDOW', 0.05),
+            metrics=bot.metrics
+        )
+
+    async def cog_load(self):
+        self.bot.metrics.add_stats('translation', self.translation_service.stats)
+
+    async def cog_unload(self):
+        self.bot.metrics.remove_stats('translation')
+        self.translation_service.shutdown()
+
+    ######################################## Google Search Command ###################################################
+    @app_commands.command(name="search", description="Quick Google search")
+    async def search(self, interaction, query: str):
+        await interaction.response.defer()
+
+        try:
+            # Non-blocking REST call, cached per query and page
+            result = await self.search_service.search(query)
+
+            if result['items']:
+                view = SearchResultsView(self.search_service, query, result)
+                await interaction.followup.send(format_search_results(query, result, 0), view=view)
+            else:
+                await interaction.followup.send(f"No results found for '{query}'")
+
+        except Exception as e:
+            self.bot.metrics.command_error(interaction, e)
+            await interaction.followup.send(f"Error performing search: {str(e)}")
+
+    ############################################# Weather Command ########################################################
+    @app_commands.command(name="weather", description="Get current weather for a location")
+    async def weather(self, interaction, location: str):
+        await interaction.response.defer()
+
+        try:
+            # Using OpenWeatherMap API
+            api_key_weather = OPENWEATHER_API_KEY
+            url = "https://api.openweathermap.org/data/2.5/weather"
+            params = {"q": location, "appid": api_key_weather, "units": "imperial"}
+
+            status, data = await self.bot.response_cache.get_or_fetch(
+                'weather', [normalize_key_part(location)],
+                lambda: self.bot.http_client.get_json(url, params=params),
+                should_cache=lambda result: result[0] == 200
+            )
+            if status != 200:
+                error_message = (data or {}).get('message', 'Unknown error')
+                print(f"Weather API error: {error_message} (Status: {status})")
+                await interaction.followup.send(f"❌ Couldn't find weather data for '{location}'. Error: {error_message}")
+                return
+
+            # Extract weather information
+            try:
+                city = data["name"]
+                country = data["sys"]["country"]
+                temp = data["main"]["temp"]
+                temp_celsius = (temp - 32) * 5/9
+                feels_like = data["main"]["feels_like"]
+                humidity = data["main"]["humidity"]
+                wind_speed = data["wind"]["speed"]
+                description = data["weather"][0]["description"]
+                icon_code = data["weather"][0]["icon"]
+                icon_url = f"http://openweathermap.org/img/wn/{icon_code}@2x.png"
+
+                # Create embed
+                embed = Embed(
+                    title=f"Weather in {city}, {country}",
+                    description=f"**{description.capitalize()}**",
+                    color=0x3498db
+                )
+                embed.set_thumbnail(url=icon_url)
+                embed.add_field(name="Temperature", value=f"{temp:.1f}°F / {temp_celsius:.1f}°C", inline=True)
+                embed.add_field(name="Feels Like", value=f"{feels_like:.1f}°F", inline=True)
+                embed.add_field(name="Humidity", value=f"{humidity}%", inline=True)
+                embed.add_field(name="Wind Speed", value=f"{wind_speed} mph", inline=True)
+                embed.set_footer(text="Data from OpenWeatherMap")
+
+                await interaction.followup.send(embed=embed)
+            except KeyError as ke:
+                print(f"Weather data parsing error: {ke} in {data}")
+                self.bot.metrics.command_error(interaction, ke)
+                await interaction.followup.send(f"❌ Error processing weather data for '{location}'. The API response format may have changed.")
+
+        except Exception as e:
+            print(f"Weather error: {str(e)}")
+            self.bot.metrics.command_error(interaction, e)
+            await interaction.followup.send(f"❌ Error fetching weather: {str(e)}")
+
+    ############################################# Translator Command ########################################################
+    @app_commands.command(name="translate", description="Translate text to another language")
+    async def translate(self, interaction, text: str, target_language: str):
+        await interaction.response.defer()
+
+        try:
+            # List of supported language codes
+            supported_languages = {
+                "english": "en", "spanish": "es", "french": "fr", "german": "de",
+                "italian": "it", "portuguese": "pt", "russian": "ru", "japanese": "ja",
+                "chinese": "zh-CN", "korean": "ko", "arabic": "ar", "hindi": "hi"
+            }
+
+            # Convert language name to code if needed
+            target_code = target_language.lower()
+            if target_code in supported_languages:
+                target_code = supported_languages[target_code]
+
+            # Perform translation (cached per exact text and target language, batched with other requests)
+            translated_text = await self.translation_service.translate(text, target_code)
+
+            if not translated_text:
+                await interaction.followup.send(f"❌ Couldn't translate to '{target_language}'. Try using a language code like 'en', 'es', 'fr', etc.")
+                return
+
+            embed = Embed(
+                title=f"Translation to {target_language}",
+                color=0x2ecc71
+            )
+            embed.add_field(name="Original Text", value=text, inline=False)
+            embed.add_field(name="Translated Text", value=translated_text, inline=False)
+
+            await interaction.followup.send(embed=embed)
+
+        except Exception as e:
+            print(f"Translation error: {str(e)}")
+            self.bot.metrics.command_error(interaction, e)
+            await interaction.followup.send(f"❌ Error during translation: {str(e)}")
+
+    ############################################# Urban Dictionary Command ########################################################
+    @app_commands.command(name="urban", description="Look up a word on Urban Dictionary")
+    async def urban(self, interaction, word: str):
+        """Look up word on Urban Dictionary"""
+        await interaction.response.defer()
+
+        try:
+            url = "https://api.urbandictionary.com/v0/define"
+
+            status, data = await self.bot.response_cache.get_or_fetch(
+                'urban', [normalize_key_part(word)],
+                lambda: self.bot.http_client.get_json(url, params={"term": word}),
+                should_cache=lambda result: result[0] == 200
+            )
+            if status != 200 or data is None:
+                await interaction.followup.send(f"❌ Couldn't fetch definition for '{word}'.")
+                return
+
+            if not data.get('list'):
+                await interaction.followup.send(f"❌ No definition found for '{word}'.")
+                return
+
+            # Get the top definition
+            definition = data['list'][0]
+
+            embed = Embed(
+                title=f"📖 {definition['word']}",
+                description=definition['definition'][:2000],  # Discord limit
+                color=0xff6b6b
+            )
+
+            if definition.get('example'):
+                embed.add_field(
+                    name="Example",
+                    value=definition['example'][:1000],
+                    inline=False
+                )
+
+            embed.add_field(name="👍", value=definition.get('thumbs_up', 0), inline=True)
+            embed.add_field(name="👎", value=definition.get('thumbs_down', 0), inline=True)
+            embed.set_footer(text="Powered by Urban Dictionary")
+
+            await interaction.followup.send(embed=embed)
+
+        except Exception as e:
+            print(f"Urban Dictionary error: {str(e)}")
+            self.bot.metrics.command_error(interaction, e)
+            await interaction.followup.send(f"❌ Error fetching definition: {str(e)}")
+
+
+async def setup(bot):
+    await bot.add_cog(Lookup(bot), **bot.command_scope)
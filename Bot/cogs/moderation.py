@@ -0,0 +1,121 @@
+# Moderation commands
+# /permamute and /unpermamute. Needs the members intent (see gateway_profile.COMMAND_INTENTS).
+# Permamutes are kept in a PermamuteStore, so they survive a restart.
+import os
+
+import discord
+from discord import app_commands, Embed
+from discord.ext import commands
+
+import config
+from permamutes import PermamuteStore
+from rest_governor import URGENT, NORMAL
+
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Moderation(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        # Users locked in a persistent server mute, per guild
+        self.permamutes = PermamuteStore(
+            db_path=getattr(config, 'PERMAMUTE_DB_PATH', os.path.join(BOT_DIR, 'permamutes.db')),
+            cooldown=getattr(config, 'PERMAMUTE_REMUTE_COOLDOWN', 2.0),
+            owns=bot.shard_plan.owns
+        )
+
+    async def cog_load(self):
+        self.permamutes.start()
+        self.bot.metrics.add_stats('permamutes', self.permamutes.stats)
+
+    async def cog_unload(self):
+        self.bot.metrics.remove_stats('permamutes')
+        await self.permamutes.close()
+
+    ############################################# Permamute Commands #####################################################
+    @app_commands.command(name="permamute", description="Permanently server-mute a user until /unpermamute is used")
+    @app_commands.default_permissions(mute_members=True)
+    async def permamute(self, interaction, target: discord.Member):
+        """Locks a user into a server mute. If they unmute, the bot instantly re-mutes them."""
+        if target.bot:
+            await interaction.response.send_message("❌ Can't permamute a bot.", ephemeral=True)
+            return
+
+        if target.id == interaction.user.id:
+            await interaction.response.send_message("❌ You can't permamute yourself... or can you? No.", ephemeral=True)
+            return
+
+        self.permamutes.add(interaction.guild_id, target.id, interaction.user.id)
+        # The mute may wait its turn in the REST governor, which could outlast the 3 second response deadline
+        await interaction.response.defer()
+
+        # Mute them immediately if they're in a voice channel
+        if target.voice and target.voice.channel:
+            try:
+                await self.bot.rest_governor.call(
+                    ('member_edit', interaction.guild_id), target.edit,
+                    mute=True, reason=f"Permamuted by {interaction.user}", priority=URGENT
+                )
+            except discord.Forbidden:
+                await interaction.followup.send("❌ I don't have permission to mute that user.")
+                return
+
+        embed = Embed(
+            title="🔇 PERMAMUTED",
+            description=f"{target.mention} has been **permanently server-muted**.\n"
+                        f"They will be re-muted every time they try to unmute.\n\n"
+                        f"Use `/unpermamute` to release them.",
+            color=0xe74c3c
+        )
+        embed.set_footer(text=f"Muted by {interaction.user.display_name}")
+        await interaction.followup.send(embed=embed)
+
+
+    @app_commands.command(name="unpermamute", description="Release a user from the permamute")
+    @app_commands.default_permissions(mute_members=True)
+    async def unpermamute(self, interaction, target: discord.Member):
+        """Releases a user from the permamute prison."""
+        if not self.permamutes.remove(interaction.guild_id, target.id):
+            await interaction.response.send_message(f"❌ {target.mention} isn't permamuted.", ephemeral=True)
+            return
+        await interaction.response.defer()
+
+        # Unmute them if they're currently in a voice channel
+        if target.voice and target.voice.channel:
+            try:
+                await self.bot.rest_governor.call(
+                    ('member_edit', interaction.guild_id), target.edit,
+                    mute=False, reason=f"Unpermamuted by {interaction.user}", priority=URGENT
+                )
+            except discord.Forbidden:
+                pass
+
+        embed = Embed(
+            title="🔊 UNPERMAMUTED",
+            description=f"{target.mention} has been **released** from the permamute. They're free... for now.",
+            color=0x2ecc71
+        )
+        await interaction.followup.send(embed=embed)
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member, before, after):
+        """Re-mutes permamuted users whenever they try to unmute themselves."""
+        # Runs for every voice event in every guild; almost all of them are dropped here
+        if not self.permamutes.needs_remute(member, after):
+            return
+
+        # If they just joined or unmuted in a voice channel, slam the mute back on (once per cooldown if they keep trying)
+        self.permamutes.schedule_remute(member, self.remute)
+
+    async def remute(self, member):
+        try:
+            await self.bot.rest_governor.call(
+                ('member_edit', member.guild.id), member.edit,
+                mute=True, reason="Permamuted — nice try", priority=NORMAL
+            )
+        except discord.Forbidden:
+            pass
+
+
+async def setup(bot):
+    await bot.add_cog(Moderation(bot), **bot.command_scope)
@@ -0,0 +1,552 @@
+# Music commands
+# Queue-based YouTube playback: yt-dlp lookups on the extractor pool, resolved tracks cached until
+# their stream URLs expire, upcoming songs prefetched, and Opus streams passed through untouched.
+# yt-dlp is imported on the first lookup, not when the group loads.
+import asyncio
+from urllib.parse import urlparse
+
+import discord
+from discord import app_commands, Embed
+from discord.ext import commands
+
+import config
+from extractor import ExtractionService
+from track_cache import TrackCache, CachedTrack
+from prefetch import TrackPrefetcher
+from music_queue import GuildMusicQueue, Track, LOOP_OFF, LOOP_TRACK, LOOP_QUEUE
+
+# YT-DLP options for audio extraction
+ytdl_format_options = {
+    # Prefer Opus audio so it can be passed through to Discord without transcoding
+    'format': 'bestaudio[acodec=opus]/bestaudio/best',
+    'outtmpl': '%(extractor)s-%(id)s-%(title)s.%(ext)s',
+    'restrictfilenames': True,
+    'noplaylist': True,
+    'nocheckcertificate': True,
+    'ignoreerrors': False,
+    'logtostderr': False,
+    'quiet': True,
+    'no_warnings': True,
+    'default_search': 'auto',
+    'source_address': '0.0.0.0',
+    'extract_flat': False,
+}
+
+ffmpeg_options = {
+    'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5',
+    'options': '-vn'
+}
+
+
+def make_audio_source(track):
+    """
+    Create an FFmpeg audio source from a resolved track's stream URL
+    Opus streams are copied straight through; anything else is decoded to PCM and re-encoded
+    """
+    if track.acodec == 'opus':
+        return discord.FFmpegOpusAudio(track.stream_url, codec='copy', **ffmpeg_options)
+    return discord.FFmpegPCMAudio(track.stream_url, **ffmpeg_options)
+
+
+def is_playlist_url(url):
+    """True for URLs that point at a whole playlist rather than a single video."""
+    parsed = urlparse(url)
+    return parsed.path.rstrip('/').endswith('/playlist') or ('list=' in parsed.query and 'v=' not in parsed.query)
+
+
+class Music(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        # Store music queues (guild_id -> GuildMusicQueue) for each guild
+        self.music_queues = {}
+
+        # Which audio path each guild's songs went through: {guild_id: {'opus': plays, 'pcm': plays, 'current': path}}
+        # 'opus' streams are copied straight to Discord; 'pcm' streams are decoded by FFmpeg and re-encoded per frame
+        self.playback_paths = {}
+
+        # Run extractions on a worker pool instead of the event loop (optional settings in config.py)
+        self.extractor = ExtractionService(
+            ytdl_format_options,
+            mode=getattr(config, 'EXTRACTOR_MODE', 'thread'),
+            max_workers=getattr(config, 'EXTRACTOR_WORKERS', 4),
+            per_guild_limit=getattr(config, 'EXTRACTOR_PER_GUILD', 2),
+            metrics=bot.metrics
+        )
+
+        # Cache resolved tracks until their stream URL expires (set TRACK_CACHE_PATH to persist across restarts)
+        self.track_cache = TrackCache(
+            max_entries=getattr(config, 'TRACK_CACHE_SIZE', 512),
+            db_path=getattr(config, 'TRACK_CACHE_PATH', None)
+        )
+
+        # Resolve the next songs in the background so transitions don't wait on yt-dlp
+        self.prefetcher = TrackPrefetcher(
+            self.resolve_track,
+            make_audio_source,
+            depth=getattr(config, 'PREFETCH_DEPTH', 2)
+        )
+
+    async def cog_load(self):
+        self.bot.metrics.add_stats('track_cache', self.track_cache.stats)
+        self.bot.metrics.add_stats('playback', self.playback_stats)
+
+    async def cog_unload(self):
+        self.bot.metrics.remove_stats('track_cache')
+        self.bot.metrics.remove_stats('playback')
+        await self.prefetcher.close()
+        self.track_cache.close()
+        self.extractor.shutdown()
+
+    async def resolve_track(self, query, guild_id=None, min_ttl=0):
+        """
+        Resolve a URL or search query to a track, using the cache when the stream URL is still valid
+
+        Args:
+            query: YouTube URL, direct audio URL or "ytsearch:" query
+            guild_id: Discord guild ID the request belongs to
+            min_ttl: Re-extract if the cached stream URL expires within this many seconds
+
+        Returns:
+            CachedTrack: Track metadata and direct stream URL
+        """
+        track = self.track_cache.get(query)
+        if track and track.ttl() >= min_ttl:
+            return track
+
+        # Extract audio information without downloading
+        data = await self.extractor.extract(query, guild_id)
+        # Handle playlists - get first entry
+        if 'entries' in data:
+            data = data['entries'][0]
+        track = CachedTrack.from_info(data)
+
+        # yt-dlp doesn't know the codec of some direct links; probe once so the cached track knows
+        if track.acodec is None:
+            try:
+                codec, _ = await discord.FFmpegOpusAudio.probe(track.stream_url)
+                track.acodec = codec or 'unknown'
+            except Exception as e:
+                print(f"Codec probe error: {str(e)}")
+                track.acodec = 'unknown'
+        return self.track_cache.put(track, query)
+
+    async def get_audio_source(self, url, guild_id=None):
+        """
+        Extract audio from URL using yt-dlp (on the self.extractor pool)
+
+        Args:
+            url: YouTube URL or direct audio URL
+            guild_id: Discord guild ID the request belongs to
+
+        Returns:
+            tuple: (FFmpeg audio source, song title) or (None, None) on error
+        """
+        try:
+            track = await self.resolve_track(url, guild_id)
+            return make_audio_source(track), track.title
+        except Exception as e:
+            print(f"Error extracting audio: {str(e)}")
+            return None, None
+
+    def record_playback_path(self, guild_id, source):
+        """Count whether a song went out as Opus passthrough or as a PCM transcode."""
+        path = 'opus' if isinstance(source, discord.FFmpegOpusAudio) else 'pcm'
+        stats = self.playback_paths.setdefault(guild_id, {'opus': 0, 'pcm': 0, 'current': None})
+        stats[path] += 1
+        stats['current'] = path
+        return path
+
+    def playback_stats(self):
+        """Songs played as Opus passthrough vs PCM transcode, in total and per guild."""
+        stats = {'opus': 0, 'pcm': 0}
+        for guild_id, paths in self.playback_paths.items():
+            for path in ('opus', 'pcm'):
+                stats[path] += paths[path]
+                stats[f'guild_{guild_id}_{path}'] = paths[path]
+        return stats
+
+    def get_music_queue(self, guild_id):
+        """Get (or create) the music queue for a guild."""
+        music_queue = self.music_queues.get(guild_id)
+        if music_queue is None:
+            music_queue = self.music_queues[guild_id] = GuildMusicQueue(guild_id)
+        return music_queue
+
+    def schedule_prefetch(self, guild_id):
+        """Point the prefetcher at the next few songs a guild's queue will play."""
+        music_queue = self.music_queues.get(guild_id)
+        upcoming = music_queue.upcoming(self.prefetcher.depth) if music_queue else []
+        self.prefetcher.schedule(guild_id, [track.url for track in upcoming])
+
+    @commands.Cog.listener()
+    async def on_voice_session_end(self, guild_id):
+        """Drop a guild's music state once its voice session ends (/leave, idle timeout, kicked from voice)."""
+        music_queue = self.music_queues.pop(guild_id, None)
+        if music_queue is not None:
+            music_queue.clear()
+        self.prefetcher.clear(guild_id)
+
+    @commands.Cog.listener()
+    async def on_voice_session_idle(self, guild_id):
+        """Start songs that were queued while a soundboard clip had the connection."""
+        if self.music_queues.get(guild_id):
+            await self.play_next(guild_id)
+
+    def play_next_sync(self, guild_id, error):
+        """
+        Callback function to play next song in queue (synchronous wrapper)
+        This is called automatically from the voice thread when a song finishes playing,
+        so it hands the work back to the event loop instead of extracting here
+
+        Args:
+            guild_id: Discord guild ID
+            error: Error from previous playback (if any)
+        """
+        if error:
+            print(f"Music playback error: {error}")
+
+        asyncio.run_coroutine_threadsafe(self.play_next(guild_id), self.bot.loop)
+
+    async def play_next(self, guild_id):
+        """
+        Play the next song in the guild's queue
+
+        Args:
+            guild_id: Discord guild ID
+
+        Returns:
+            Track: The song now playing, or None
+        """
+        music_queue = self.music_queues.get(guild_id)
+        if music_queue is None:
+            return None
+
+        async with music_queue.lock:
+            # Check if bot is still connected to voice channel
+            voice_client = self.bot.voice_sessions.voice_client(guild_id)
+            if voice_client is None:
+                return None
+
+            # Someone else may have started playback while we waited for the lock
+            if voice_client.is_playing() or voice_client.is_paused():
+                return None
+
+            # Skip past songs that fail to load instead of stalling the queue
+            for _ in range(len(music_queue) + 1):
+                track = music_queue.advance()
+                if track is None:
+                    return None
+
+                # Prefer the source the self.prefetcher already built
+                try:
+                    source, _ = self.prefetcher.take(guild_id, track.url)
+                except Exception as e:
+                    print(f"Prefetched source error: {str(e)}")
+                    source = None
+                if not source:
+                    source, _ = await self.get_audio_source(track.url, guild_id)
+                if source:
+                    break
+                music_queue.request_skip()
+            else:
+                return None
+
+            # The bot may have left while the song was resolving
+            if not voice_client.is_connected():
+                source.cleanup()
+                return None
+
+            # Play the song and start resolving the one after it
+            self.record_playback_path(guild_id, source)
+            voice_client.play(source, after=lambda e: self.play_next_sync(guild_id, e))
+            self.schedule_prefetch(guild_id)
+            return track
+
+    async def queue_playlist(self, interaction, url, guild_id):
+        """
+        Stream a playlist into the guild's queue as yt-dlp pages through it
+        Entries are queued flat; the self.prefetcher resolves their streams as they near the front
+
+        Args:
+            interaction: The /play interaction (already deferred)
+            url: Playlist URL
+            guild_id: Discord guild ID
+        """
+        music_queue = self.get_music_queue(guild_id)
+        generation = music_queue.generation
+        message = await interaction.followup.send("📜 Loading playlist...")
+        added = 0
+        starting = None
+
+        try:
+            async for entry in self.extractor.stream_playlist(url, guild_id, limit=getattr(config, 'PLAYLIST_LIMIT', 500)):
+                # Stop if the queue was cleared (/stop) or dropped (/leave) mid-ingestion
+                if music_queue.generation != generation or self.music_queues.get(guild_id) is not music_queue:
+                    break
+
+                entry_url = entry.get('webpage_url') or entry.get('url')
+                if not entry_url:
+                    continue
+                music_queue.enqueue(Track(entry_url, entry.get('title') or entry_url, int(entry.get('duration') or 0)))
+                added += 1
+
+                # Start the first song right away instead of waiting for the rest of the playlist
+                voice_client = self.bot.voice_sessions.voice_client(guild_id)
+                if added == 1 and voice_client and not voice_client.is_playing() and not voice_client.is_paused():
+                    # In the background, so ingestion doesn't wait on the first song resolving
+                    starting = asyncio.ensure_future(self.play_next(guild_id))
+                elif len(music_queue) <= self.prefetcher.depth:
+                    self.schedule_prefetch(guild_id)
+
+                if added % 100 == 0:
+                    await message.edit(content=f"📜 Loading playlist... {added} songs queued so far")
+        except Exception as e:
+            print(f"Playlist error: {str(e)}")
+            if not added:
+                await message.edit(content=f"❌ Error loading playlist: {str(e)}")
+                return
+
+        if not added:
+            await message.edit(content="❌ Couldn't find any songs in that playlist.")
+            return
+
+        now_playing = None
+        if starting is not None:
+            try:
+                now_playing = await starting
+            except Exception as e:
+                print(f"Playlist playback error: {str(e)}")
+
+        embed = Embed(
+            title="📜 Playlist Queued",
+            description=f"Added **{added}** songs to the queue",
+            color=0x1db954
+        )
+        if now_playing:
+            embed.add_field(name="Now Playing", value=now_playing.title, inline=False)
+        await message.edit(content=None, embed=embed)
+
+    @app_commands.command(name="play", description="Play music from YouTube URL or search term")
+    async def play(self, interaction, query: str, playlist: bool = False):
+        """Play music from YouTube (set playlist to queue a whole playlist URL)"""
+        await interaction.response.defer()
+
+        # Check if user is in a voice channel
+        if not interaction.user.voice:
+            await interaction.followup.send("❌ You need to be in a voice channel to play music!")
+            return
+
+        voice_channel = interaction.user.voice.channel
+        guild_id = interaction.guild.id
+
+        # Join (or reuse) the guild's voice session; it stays up until /leave or it goes idle
+        try:
+            await self.bot.voice_sessions.acquire(voice_channel, "music")
+        except Exception as e:
+            await interaction.followup.send(f"❌ Error connecting to voice channel: {str(e)}")
+            return
+
+        music_queue = self.get_music_queue(guild_id)
+
+        # Playlist URLs are streamed into the queue instead of resolved up front
+        if playlist or (query.startswith(('http://', 'https://')) and is_playlist_url(query)):
+            if not query.startswith(('http://', 'https://')):
+                await interaction.followup.send("❌ Playlist mode needs a playlist URL.")
+                return
+            await self.queue_playlist(interaction, query, guild_id)
+            return
+
+        # Determine if query is URL or search term
+        if not query.startswith(('http://', 'https://')):
+            query = f"ytsearch:{query}"
+
+        # Extract audio info
+        try:
+            resolved = await self.resolve_track(query, guild_id)
+
+            # Queue the stable page URL; the stream URL is looked up (or re-resolved) from the cache
+            position = music_queue.enqueue(Track(resolved.webpage_url, resolved.title, resolved.duration))
+
+            # If nothing is playing, start playing
+            voice_client = self.bot.voice_sessions.voice_client(guild_id)
+            if voice_client and not voice_client.is_playing() and not voice_client.is_paused():
+                now_playing = await self.play_next(guild_id)
+                if now_playing:
+                    embed = Embed(
+                        title="🎵 Now Playing",
+                        description=f"**{now_playing.title}**",
+                        color=0x1db954
+                    )
+                    if now_playing.duration:
+                        minutes, seconds = divmod(now_playing.duration, 60)
+                        embed.add_field(name="Duration", value=f"{minutes}:{seconds:02d}", inline=True)
+                    embed.add_field(name="Queue Position", value="Now Playing", inline=True)
+                    await interaction.followup.send(embed=embed)
+                else:
+                    await interaction.followup.send("❌ Failed to load audio source.")
+            else:
+                # Get it resolved before its turn comes up
+                self.schedule_prefetch(guild_id)
+
+                embed = Embed(
+                    title="✅ Added to Queue",
+                    description=f"**{resolved.title}**",
+                    color=0x1db954
+                )
+                embed.add_field(name="Position", value=f"#{position}", inline=True)
+                await interaction.followup.send(embed=embed)
+
+        except Exception as e:
+            print(f"Play error: {str(e)}")
+            self.bot.metrics.command_error(interaction, e)
+            await interaction.followup.send(f"❌ Error playing music: {str(e)}")
+
+    @app_commands.command(name="pause", description="Pause the currently playing music")
+    async def pause(self, interaction):
+        """Pause music"""
+        guild_id = interaction.guild.id
+
+        voice_client = self.bot.voice_sessions.voice_client(guild_id)
+        if voice_client and voice_client.is_playing():
+            voice_client.pause()
+            await interaction.response.send_message("⏸️ Music paused.")
+        else:
+            await interaction.response.send_message("❌ Nothing is currently playing.", ephemeral=True)
+
+    @app_commands.command(name="resume", description="Resume paused music")
+    async def resume(self, interaction):
+        """Resume music"""
+        guild_id = interaction.guild.id
+
+        voice_client = self.bot.voice_sessions.voice_client(guild_id)
+        if voice_client and voice_client.is_paused():
+            voice_client.resume()
+            await interaction.response.send_message("▶️ Music resumed.")
+        else:
+            await interaction.response.send_message("❌ Music is not paused.", ephemeral=True)
+
+    @app_commands.command(name="skip", description="Skip the current song")
+    async def skip(self, interaction):
+        """Skip current song"""
+        guild_id = interaction.guild.id
+
+        voice_client = self.bot.voice_sessions.voice_client(guild_id)
+        if voice_client and voice_client.is_playing():
+            # Move on even if the current song is on loop
+            self.get_music_queue(guild_id).request_skip()
+            voice_client.stop()
+            await interaction.response.send_message("⏭️ Skipped current song.")
+        else:
+            await interaction.response.send_message("❌ Nothing is currently playing.", ephemeral=True)
+
+    @app_commands.command(name="queue", description="Show the music queue")
+    async def queue(self, interaction):
+        """Show music queue"""
+        music_queue = self.music_queues.get(interaction.guild.id)
+
+        if music_queue is None or (not music_queue and music_queue.current is None):
+            await interaction.response.send_message("📭 The queue is empty.")
+            return
+
+        embed = Embed(title="📋 Music Queue", color=0x1db954)
+        if music_queue.current is not None:
+            embed.add_field(name="Now Playing", value=music_queue.current.title, inline=False)
+
+        # Only the first 10 items are rendered, however long the queue is
+        lines = [f"{idx}. {track.title}" for idx, track in enumerate(music_queue.peek(10), 1)]
+        if len(music_queue) > 10:
+            lines.append(f"\n... and {len(music_queue) - 10} more")
+
+        embed.description = "\n".join(lines) or "Nothing queued up next"
+        footer = []
+        stats = self.playback_paths.get(interaction.guild.id)
+        if music_queue.loop_mode != LOOP_OFF:
+            footer.append(f"🔁 Looping: {music_queue.loop_mode}")
+        if stats:
+            footer.append(f"🎧 Streams: {stats['opus']} Opus passthrough, {stats['pcm']} transcoded")
+        if footer:
+            embed.set_footer(text=" • ".join(footer))
+        await interaction.response.send_message(embed=embed)
+
+    @app_commands.command(name="remove", description="Remove a song from the queue")
+    async def remove(self, interaction, position: int):
+        """Remove a queued song by its position"""
+        music_queue = self.music_queues.get(interaction.guild.id)
+
+        if not music_queue or not 1 <= position <= len(music_queue):
+            await interaction.response.send_message("❌ There's no song at that position.", ephemeral=True)
+            return
+
+        track = music_queue.remove(position - 1)
+        self.schedule_prefetch(interaction.guild.id)
+        await interaction.response.send_message(f"🗑️ Removed **{track.title}** from the queue.")
+
+    @app_commands.command(name="move", description="Move a song to a different spot in the queue")
+    async def move(self, interaction, from_position: int, to_position: int):
+        """Move a queued song to a new position"""
+        music_queue = self.music_queues.get(interaction.guild.id)
+
+        if not music_queue or not 1 <= from_position <= len(music_queue):
+            await interaction.response.send_message("❌ There's no song at that position.", ephemeral=True)
+            return
+
+        track = music_queue.move(from_position - 1, to_position - 1)
+        self.schedule_prefetch(interaction.guild.id)
+        await interaction.response.send_message(f"↕️ Moved **{track.title}** to position #{min(max(to_position, 1), len(music_queue))}.")
+
+    @app_commands.command(name="shuffle", description="Shuffle the music queue")
+    async def shuffle(self, interaction):
+        """Shuffle the queued songs"""
+        music_queue = self.music_queues.get(interaction.guild.id)
+
+        if not music_queue:
+            await interaction.response.send_message("📭 The queue is empty.", ephemeral=True)
+            return
+
+        music_queue.shuffle()
+        self.schedule_prefetch(interaction.guild.id)
+        await interaction.response.send_message(f"🔀 Shuffled {len(music_queue)} songs.")
+
+    @app_commands.command(name="loop", description="Loop the current song, the whole queue, or turn looping off")
+    @app_commands.choices(mode=[
+        app_commands.Choice(name="Off", value=LOOP_OFF),
+        app_commands.Choice(name="Current song", value=LOOP_TRACK),
+        app_commands.Choice(name="Whole queue", value=LOOP_QUEUE),
+    ])
+    async def loop(self, interaction, mode: app_commands.Choice[str]):
+        """Set the loop mode"""
+        guild_id = interaction.guild.id
+        self.get_music_queue(guild_id).set_loop(mode.value)
+        self.schedule_prefetch(guild_id)
+        await interaction.response.send_message(f"🔁 Loop mode: **{mode.name}**")
+
+    @app_commands.command(name="stop", description="Stop music and clear queue")
+    async def stop(self, interaction):
+        """Stop music and clear queue"""
+        guild_id = interaction.guild.id
+
+        voice_client = self.bot.voice_sessions.voice_client(guild_id)
+        if voice_client:
+            if guild_id in self.music_queues:
+                self.music_queues[guild_id].clear()
+            self.prefetcher.clear(guild_id)
+            voice_client.stop()
+            await interaction.response.send_message("🛑 Music stopped and queue cleared.")
+        else:
+            await interaction.response.send_message("❌ Nothing is currently playing.", ephemeral=True)
+
+    @app_commands.command(name="leave", description="Make the bot leave the voice channel")
+    async def leave(self, interaction):
+        """Leave voice channel"""
+        guild_id = interaction.guild.id
+
+        if self.bot.voice_sessions.voice_client(guild_id):
+            # The disconnect handler drops the queue and anything prefetched
+            await self.bot.voice_sessions.disconnect(guild_id)
+            await interaction.response.send_message("👋 Left the voice channel.")
+        else:
+            await interaction.response.send_message("❌ I'm not in a voice channel.", ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Music(bot), **bot.command_scope)
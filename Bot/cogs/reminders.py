@@ -0,0 +1,137 @@
+# Reminder commands
+# /remind, /reminders and /cancelreminder on top of the persisted ReminderScheduler, which runs
+# for as long as this group is loaded.
+import os, re
+
+import discord
+from discord import app_commands, Embed
+from discord.ext import commands
+
+import config
+from reminders import ReminderScheduler, ReminderLimitReached
+from rest_governor import BACKGROUND
+
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_time(time_str):
+    """Convert time string (e.g., '1h30m', '45m', '2h') to seconds"""
+    total_seconds = 0
+    pattern = re.compile(r'(\d+)([hm])')
+    matches = pattern.findall(time_str)
+
+    for value, unit in matches:
+        value = int(value)
+        if unit == 'h':
+            total_seconds += value * 3600
+        elif unit == 'm':
+            total_seconds += value * 60
+
+    return total_seconds
+
+
+class Reminders(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        # Every pending reminder lives in one persisted scheduler, started when the group loads
+        self.scheduler = ReminderScheduler(
+            self.deliver_reminders,
+            db_path=getattr(config, 'REMINDER_DB_PATH', os.path.join(BOT_DIR, 'reminders.db')),
+            max_per_user=getattr(config, 'REMINDERS_PER_USER', 25),
+            # DMs are paced by the REST governor's 'dm' route instead
+            send_interval=0,
+            owns=bot.shard_plan.owns
+        )
+
+    async def cog_load(self):
+        self.scheduler.start()
+        self.bot.metrics.add_stats('reminders', self.scheduler.stats)
+
+    async def cog_unload(self):
+        self.bot.metrics.remove_stats('reminders')
+        await self.scheduler.close()
+
+    async def deliver_reminders(self, user_id, reminders, late):
+        """
+        Send a user every reminder that came due together in one DM.
+        Falls back to the channel the first reminder was set in if their DMs are closed.
+
+        Args:
+            user_id: Discord user ID
+            reminders: Due Reminder records (oldest first)
+            late: True if these came due while the bot was offline
+        """
+        await self.bot.wait_until_ready()
+        lines = [
+            f"⏰ **Reminder:** {reminder.message}\n*(Set <t:{int(reminder.created_at)}:R>)*"
+            for reminder in reminders
+        ]
+        if late:
+            lines.append("*Sorry, these are late - I was offline when they came due.*")
+        content = "\n\n".join(lines)[:2000]
+
+        try:
+            user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+            await self.bot.rest_governor.call(('dm', None), user.send, content, priority=BACKGROUND)
+        except discord.Forbidden:
+            # If DM is blocked, try to send to the original channel
+            channel = self.bot.get_channel(reminders[0].channel_id) or await self.bot.fetch_channel(reminders[0].channel_id)
+            await self.bot.rest_governor.call(
+                ('message', channel.id), channel.send,
+                f"<@{user_id}>, here's your reminder:\n{content}"[:2000], priority=BACKGROUND
+            )
+
+    @app_commands.command(name="remind", description="Set a reminder (format: 1h30m, 45m, 2h)")
+    async def remind(self, interaction, time: str, reminder: str):
+        try:
+            seconds = parse_time(time)
+            if seconds <= 0:
+                raise ValueError("Invalid time format")
+
+            # Schedule the reminder (stored, so it survives a restart)
+            scheduled = self.scheduler.add(
+                interaction.user.id,
+                interaction.guild_id,
+                interaction.channel_id,
+                reminder,
+                seconds
+            )
+
+            await interaction.response.send_message(
+                f"✅ I'll remind you about: '{reminder}' in {time} (reminder #{scheduled.id})"
+            )
+
+        except ReminderLimitReached as e:
+            await interaction.response.send_message(f"❌ {str(e)}. Cancel one with /cancelreminder first.", ephemeral=True)
+        except ValueError as e:
+            await interaction.response.send_message(
+                "❌ Invalid time format! Please use combinations of hours and minutes (e.g., 1h30m, 45m, 2h)",
+                ephemeral=True
+            )
+
+    @app_commands.command(name="reminders", description="List your pending reminders")
+    async def reminders(self, interaction):
+        pending = self.scheduler.list_for(interaction.user.id)
+        if not pending:
+            await interaction.response.send_message("📭 You have no pending reminders.", ephemeral=True)
+            return
+
+        embed = Embed(title="⏰ Your Reminders", color=0x3498db)
+        for scheduled in pending:
+            embed.add_field(
+                name=f"#{scheduled.id}",
+                value=f"{scheduled.message[:900]}\nDue <t:{int(scheduled.due_at)}:R>",
+                inline=False
+            )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="cancelreminder", description="Cancel one of your reminders")
+    async def cancelreminder(self, interaction, reminder_id: int):
+        if self.scheduler.cancel(interaction.user.id, reminder_id):
+            await interaction.response.send_message(f"🗑️ Cancelled reminder #{reminder_id}.", ephemeral=True)
+        else:
+            await interaction.response.send_message(f"❌ You don't have a reminder #{reminder_id}. Use /reminders to see yours.", ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Reminders(bot), **bot.command_scope)
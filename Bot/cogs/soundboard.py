@@ -0,0 +1,152 @@
+# Soundboard commands
+# /screechkick and /sfx: short clips played from memory through the shared voice sessions.
+import os, random
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+import config
+from audio_sources import SoundLibrary
+from tones import tone_pcm
+from voice_sessions import VoiceSessionError, VoiceBusy
+
+
+def _find_ffmpeg():
+    """Locate ffmpeg: check the system PATH first, fall back to common install locations."""
+    import shutil
+    path = shutil.which("ffmpeg")
+    if path:
+        return path
+
+    # Common Windows install locations as a fallback
+    fallback_dirs = [
+        os.path.expandvars(r"%LOCALAPPDATA%\Microsoft\WinGet\Links"),
+        r"C:\ffmpeg\bin",
+        r"C:\ProgramData\chocolatey\bin",
+    ]
+    for directory in fallback_dirs:
+        candidate = os.path.join(directory, "ffmpeg.exe")
+        if os.path.isfile(candidate):
+            return candidate
+
+    return "ffmpeg"  # Last resort — hope it's on PATH at runtime
+
+
+class Soundboard(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        # Sound effects decoded once and played from memory (generated tones plus files in SOUNDS_DIR)
+        self.sound_library = SoundLibrary(directory=getattr(config, 'SOUNDS_DIR', None), ffmpeg=_find_ffmpeg())
+        self.sound_library.register("screech", tone_pcm)
+
+    ############################################# Screech Kick Command ###################################################
+    @app_commands.command(name="screechkick", description="Join VC, play an awful screech, then kick a random person")
+    @app_commands.default_permissions(move_members=True)
+    async def screechkick(self, interaction):
+        """Joins the caller's voice channel, plays an ear-piercing screech, then
+        disconnects a random member from the channel."""
+        await interaction.response.defer()
+
+        # Make sure the caller is in a voice channel
+        if not interaction.user.voice or not interaction.user.voice.channel:
+            await interaction.followup.send("❌ You need to be in a voice channel to use this!", ephemeral=True)
+            return
+
+        vc_channel = interaction.user.voice.channel
+        members_in_vc = [m for m in vc_channel.members if not m.bot]
+
+        if len(members_in_vc) == 0:
+            await interaction.followup.send("❌ No humans in the voice channel to kick!", ephemeral=True)
+            return
+
+        # Pick the victim before joining
+        victim = random.choice(members_in_vc)
+
+        try:
+            # Borrow the guild's voice connection (refused if music is playing)
+            voice_client = await self.bot.voice_sessions.acquire(vc_channel, "screechkick", exclusive=True)
+        except VoiceBusy:
+            await interaction.followup.send("❌ I'm busy playing something else in voice right now.", ephemeral=True)
+            return
+        except VoiceSessionError as e:
+            await interaction.followup.send(f"❌ {str(e)}", ephemeral=True)
+            return
+
+        try:
+            await interaction.followup.send(
+                f"📢 **INCOMING...**\n\n"
+                f"🎯 Someone in **{vc_channel.name}** is about to have a very bad time..."
+            )
+
+            # Play the screech from memory (synthesized on first use, no FFmpeg needed)
+            await self.bot.voice_sessions.play_and_wait(voice_client, await self.sound_library.source("screech"))
+
+            # Kick the victim from voice by disconnecting them
+            try:
+                await victim.move_to(None, reason="Screech-kicked by the bot")
+                kick_msg = f"💀 **{victim.display_name}** got screech-kicked! Rest in peace."
+            except discord.Forbidden:
+                kick_msg = f"😤 Tried to kick **{victim.display_name}** but I don't have permission!"
+
+            await interaction.followup.send(kick_msg)
+
+        except Exception as e:
+            print(f"Screechkick error: {str(e)}")
+            self.bot.metrics.command_error(interaction, e)
+            await interaction.followup.send(f"❌ Something went wrong: {str(e)}")
+        finally:
+            # Hand the connection back (the bot leaves unless music is using it)
+            await self.bot.voice_sessions.release(interaction.guild.id, "screechkick")
+
+    ############################################# Sound Effect Command ###################################################
+    async def sound_name_autocomplete(self, interaction, current: str):
+        """Suggest sound effect names matching what the user has typed so far"""
+        current = current.lower()
+        return [
+            app_commands.Choice(name=name, value=name)
+            for name in self.sound_library.names() if current in name.lower()
+        ][:25]
+
+    @app_commands.command(name="sfx", description="Play a sound effect in your voice channel")
+    @app_commands.autocomplete(name=sound_name_autocomplete)
+    async def sfx(self, interaction, name: str):
+        """Play a clip from the sound library without spawning FFmpeg"""
+        if not interaction.user.voice or not interaction.user.voice.channel:
+            await interaction.response.send_message("❌ You need to be in a voice channel to use this!", ephemeral=True)
+            return
+
+        session = self.bot.voice_sessions.get(interaction.guild.id)
+        if session is not None and session.busy:
+            await interaction.response.send_message("❌ I'm already playing something here.", ephemeral=True)
+            return
+
+        await interaction.response.defer()
+
+        try:
+            source = await self.sound_library.source(name)
+        except KeyError:
+            await interaction.followup.send(f"❌ Unknown sound '{name}'.")
+            return
+
+        try:
+            voice_client = await self.bot.voice_sessions.acquire(interaction.user.voice.channel, "sfx", exclusive=True)
+        except VoiceSessionError as e:
+            source.cleanup()
+            await interaction.followup.send(f"❌ {str(e)}")
+            return
+
+        try:
+            await interaction.followup.send(f"🔊 Playing **{name}**")
+            await self.bot.voice_sessions.play_and_wait(voice_client, source)
+        except Exception as e:
+            print(f"Sound effect error: {str(e)}")
+            self.bot.metrics.command_error(interaction, e)
+            await interaction.followup.send(f"❌ Couldn't play that sound: {str(e)}")
+        finally:
+            # The bot leaves again if it only joined for this clip
+            await self.bot.voice_sessions.release(interaction.guild.id, "sfx")
+
+
+async def setup(bot):
+    await bot.add_cog(Soundboard(bot), **bot.command_scope)
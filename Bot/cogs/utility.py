@@ -0,0 +1,178 @@
+# Utility commands
+# /poll, /pollresults and /countdown. Polls are button polls tallied in memory by a PollStore.
+import os
+from datetime import datetime
+from typing import Optional
+
+import discord
+from discord import app_commands, Embed
+from discord.ext import commands
+
+import config
+from polls import PollStore
+from rest_governor import BACKGROUND
+
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+POLL_EMOJIS = ["1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣"]
+
+
+def poll_embed(poll, results=False):
+    """Render a poll's tally."""
+    total = poll.total
+    lines = []
+    for idx, option in enumerate(poll.options):
+        count = poll.counts[idx]
+        share = count / total if total else 0
+        bar = "█" * round(share * 12) + "░" * (12 - round(share * 12))
+        lines.append(f"{POLL_EMOJIS[idx]} **{option}**\n{bar} {count} ({share:.0%})")
+
+    embed = Embed(
+        title=f"📊 {'Results' if results else 'Poll'}: {poll.question}",
+        description="\n\n".join(lines),
+        color=0x3498db
+    )
+    embed.set_footer(text=f"Poll #{poll.id} · {total} vote{'s' if total != 1 else ''}"
+                          + ("" if results else f" · /pollresults {poll.id}"))
+    return embed
+
+
+class PollButton(discord.ui.DynamicItem[discord.ui.Button], template=r'poll:(?P<poll_id>[0-9]+):(?P<option>[0-9])'):
+    """One option's vote button. The poll and option live in the custom_id, so buttons keep working after a restart."""
+
+    def __init__(self, poll_id, option, label=None):
+        super().__init__(discord.ui.Button(
+            label=label,
+            emoji=POLL_EMOJIS[option],
+            style=discord.ButtonStyle.secondary,
+            custom_id=f"poll:{poll_id}:{option}"
+        ))
+        self.poll_id = poll_id
+        self.option = option
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(int(match['poll_id']), int(match['option']))
+
+    async def callback(self, interaction):
+        cog = interaction.client.get_cog('Utility')
+        poll = cog.polls.get(self.poll_id) if cog is not None else None
+        if poll is None or self.option >= len(poll.options):
+            await interaction.response.send_message("❌ This poll has closed.", ephemeral=True)
+            return
+
+        # The tally changes now; the poll message catches up on the next update
+        choice = cog.polls.vote(poll, interaction.user.id, self.option)
+        if choice is None:
+            await interaction.response.send_message("🗑️ Vote removed.", ephemeral=True)
+        else:
+            await interaction.response.send_message(f"✅ You voted for {POLL_EMOJIS[choice]} **{poll.options[choice]}**.", ephemeral=True)
+
+
+class Utility(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        # Open polls and their votes, persisted; poll messages are re-rendered at most once per interval
+        self.polls = PollStore(
+            self.update_poll_message,
+            db_path=getattr(config, 'POLL_DB_PATH', os.path.join(BOT_DIR, 'polls.db')),
+            update_interval=getattr(config, 'POLL_UPDATE_INTERVAL', 3.0),
+            max_age=getattr(config, 'POLL_MAX_AGE_DAYS', 30) * 86400,
+            owns=bot.shard_plan.owns
+        )
+
+    async def cog_load(self):
+        self.polls.start()
+        self.bot.add_dynamic_items(PollButton)
+        self.bot.metrics.add_stats('polls', self.polls.stats)
+
+    async def cog_unload(self):
+        self.bot.metrics.remove_stats('polls')
+        self.bot.remove_dynamic_items(PollButton)
+        await self.polls.close()
+
+    async def update_poll_message(self, poll):
+        """Show a poll's current tally on its message (queued behind more urgent REST calls)."""
+        message = self.bot.get_partial_messageable(poll.channel_id, guild_id=poll.guild_id).get_partial_message(poll.message_id)
+        self.bot.rest_governor.submit(('message', poll.channel_id), message.edit, embed=poll_embed(poll), priority=BACKGROUND)
+
+    ##################################### Poll Command ##############################################
+    @app_commands.command(name="poll", description="Create a poll with 2-5 options")
+    async def poll(self, interaction, question: str, option1: str, option2: str,
+                   option3: Optional[str] = None, option4: Optional[str] = None, option5: Optional[str] = None):
+        options = [opt for opt in [option1, option2, option3, option4, option5] if opt is not None]
+        poll = self.polls.create(interaction.guild_id, interaction.channel_id, question, options, interaction.user.id)
+
+        # One message with a vote button per option, usable as soon as it's sent
+        view = discord.ui.View(timeout=None)
+        for idx, option in enumerate(options):
+            view.add_item(PollButton(poll.id, idx, label=option[:80]))
+
+        response = await interaction.response.send_message(embed=poll_embed(poll), view=view)
+        self.polls.attach(poll, response.message_id)
+
+    @app_commands.command(name="pollresults", description="Show the current results of a poll")
+    async def pollresults(self, interaction, poll_id: Optional[int] = None):
+        """Results straight from the tally, so they're current even between message updates."""
+        poll = self.polls.get(poll_id) if poll_id is not None else self.polls.latest_in_channel(interaction.channel_id)
+        if poll is None or poll.guild_id != interaction.guild_id:
+            await interaction.response.send_message(
+                f"❌ No open poll #{poll_id}." if poll_id is not None else "❌ There's no open poll in this channel.",
+                ephemeral=True
+            )
+            return
+
+        embed = poll_embed(poll, results=True)
+        choice = poll.votes.get(interaction.user.id)
+        if choice is not None:
+            embed.add_field(name="Your vote", value=f"{POLL_EMOJIS[choice]} {poll.options[choice]}", inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    ############################################# Countdown Timer Command ########################################################
+    @app_commands.command(name="countdown", description="Create a countdown to an event")
+    async def countdown(self, interaction, event_name: str, date: str):
+        await interaction.response.defer()
+
+        try:
+            # Parse the date (dateutil is only imported once someone uses /countdown)
+            from dateutil import parser
+            try:
+                target_date = parser.parse(date)
+            except:
+                await interaction.followup.send("❌ Invalid date format. Please use a format like 'YYYY-MM-DD' or 'MM/DD/YYYY'.")
+                return
+
+            # Calculate time difference
+            now = datetime.now()
+            if target_date < now:
+                await interaction.followup.send("❌ The specified date is in the past.")
+                return
+
+            # Calculate time remaining
+            time_diff = target_date - now
+            days = time_diff.days
+            hours, remainder = divmod(time_diff.seconds, 3600)
+            minutes, seconds = divmod(remainder, 60)
+
+            # Format the countdown message
+            embed = Embed(
+                title=f"⏰ Countdown to {event_name}",
+                description=f"**Target Date:** {target_date.strftime('%A, %B %d, %Y')}",
+                color=0xe74c3c
+            )
+
+            time_remaining = f"{days} days, {hours} hours, {minutes} minutes"
+            embed.add_field(name="Time Remaining", value=time_remaining, inline=False)
+
+            # Add exact date and time
+            embed.set_footer(text=f"Event occurs at: {target_date.strftime('%Y-%m-%d %H:%M:%S')}")
+
+            await interaction.followup.send(embed=embed)
+
+        except Exception as e:
+            print(f"Countdown error: {str(e)}")
+            self.bot.metrics.command_error(interaction, e)
+            await interaction.followup.send(f"❌ Error creating countdown: {str(e)}")
+
+
+async def setup(bot):
+    await bot.add_cog(Utility(bot), **bot.command_scope)
@@ -0,0 +1,164 @@
+# Content packs
+# Static response lists (8-ball answers, fallback facts and words, tips) loaded once into tuples,
+# with per-guild override packs. A background check reloads any pack whose file changed, so
+# commands pick from memory and never touch the disk themselves.
+import asyncio, os, random
+
+
+def read_pack(path, fields=None):
+    """
+    Read a pack file: one entry per line, blank lines and lines starting with # skipped.
+
+    Args:
+        path: Pack file
+        fields: Split each line on "|" into this many stripped fields (entries become tuples),
+                or None to keep each line as a string
+
+    Returns:
+        tuple: The entries
+    """
+    entries = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if fields is None:
+                entries.append(line)
+                continue
+            parts = tuple(part.strip() for part in line.split('|', fields - 1))
+            if len(parts) != fields:
+                raise ValueError(f"{path}: expected {fields} fields separated by '|' in {line!r}")
+            entries.append(parts)
+    if not entries:
+        raise ValueError(f"{path} has no entries")
+    return tuple(entries)
+
+
+class ContentLibrary:
+    """
+    Call start() once the event loop is running and close() on shutdown.
+
+    Args:
+        directory: Folder holding the base packs (<name>.txt)
+        override_dir: Optional folder of per-guild packs, <override_dir>/<guild_id>/<name>.txt,
+                      each replacing the base pack in that guild
+        check_interval: Seconds between checks for changed, added or removed pack files
+    """
+
+    def __init__(self, directory, override_dir=None, check_interval=30):
+        self.directory = directory
+        self.override_dir = override_dir
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._fields = {}
+        self._packs = {}
+        self._overrides = {}
+        self._mtimes = {}
+        self._task = None
+
+    def register(self, name, fields=None):
+        """Declare a pack (<name>.txt); see read_pack for fields."""
+        self._fields[name] = fields
+
+    def start(self):
+        """Load every registered pack (a missing or empty base pack raises) and start watching for changes."""
+        for name, fields in self._fields.items():
+            path = self._path(name)
+            self._mtimes[path] = os.stat(path).st_mtime
+            self._packs[name] = read_pack(path, fields)
+        self._apply(self._scan())
+        if self._task is None and self.check_interval:
+            self._task = asyncio.ensure_future(self._watch())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _path(self, name, guild_id=None):
+        if guild_id is None:
+            return os.path.join(self.directory, name + '.txt')
+        return os.path.join(self.override_dir, str(guild_id), name + '.txt')
+
+    # ---- lookups ----
+    def get(self, name, guild_id=None):
+        """A pack's entries, from the guild's override when it has one."""
+        if guild_id is not None and self._overrides:
+            pack = self._overrides.get((guild_id, name))
+            if pack is not None:
+                return pack
+        return self._packs[name]
+
+    def choice(self, name, guild_id=None):
+        """A random entry from a pack."""
+        return random.choice(self.get(name, guild_id))
+
+    def stats(self):
+        return {
+            'packs': len(self._packs),
+            'overrides': len(self._overrides),
+            'reloads': self.reloads,
+        }
+
+    # ---- reloading ----
+    def _scan(self):
+        """
+        Stat every pack file and read the ones that changed (runs off the event loop).
+
+        Returns:
+            dict: {(guild_id or None, name): entries, or None for an override that was removed}
+        """
+        paths = {(None, name): self._path(name) for name in self._fields}
+        if self.override_dir and os.path.isdir(self.override_dir):
+            for entry in os.listdir(self.override_dir):
+                if entry.isdigit():
+                    for name in self._fields:
+                        paths[(int(entry), name)] = self._path(name, entry)
+
+        changes = {}
+        for key, path in paths.items():
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                mtime = None
+            if mtime == self._mtimes.get(path):
+                continue
+            self._mtimes[path] = mtime
+            if mtime is None:
+                # Deleted: an override falls back to the base pack, a base pack keeps its last entries
+                if key[0] is not None:
+                    changes[key] = None
+                continue
+            try:
+                changes[key] = read_pack(path, self._fields[key[1]])
+            except (OSError, ValueError) as e:
+                # Keep serving the last good version until the file is fixed
+                print(f"Content pack error: {str(e)}")
+
+        # Overrides whose guild folder disappeared entirely
+        for key in self._overrides:
+            if key not in paths:
+                self._mtimes.pop(self._path(key[1], key[0]), None)
+                changes[key] = None
+        return changes
+
+    def _apply(self, changes):
+        for (guild_id, name), entries in changes.items():
+            if guild_id is None:
+                self._packs[name] = entries
+            elif entries is None:
+                self._overrides.pop((guild_id, name), None)
+            else:
+                self._overrides[(guild_id, name)] = entries
+
+    async def _watch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                changes = await loop.run_in_executor(None, self._scan)
+                self._apply(changes)
+                self.reloads += len(changes)
+            except Exception as e:
+                print(f"Content pack reload error: {str(e)}")
@@ -0,0 +1,209 @@
+# YT-DLP extraction service
+# Runs yt-dlp lookups on a bounded worker pool so a slow search never blocks the gateway loop.
+# yt-dlp itself is imported when the first YoutubeDL is built, not when the bot starts.
+import asyncio, threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import nullcontext
+from urllib.parse import urlparse
+
+# YoutubeDL instance owned by a process-pool worker (built once per worker process)
+_worker_ytdl = None
+
+
+def build_ytdl(ytdl_options):
+    """Build a YoutubeDL instance (importing yt-dlp on first use)."""
+    import yt_dlp
+    return yt_dlp.YoutubeDL(ytdl_options)
+
+
+def _init_worker(ytdl_options):
+    """Build the per-process YoutubeDL instance when a pool worker starts."""
+    global _worker_ytdl
+    _worker_ytdl = build_ytdl(ytdl_options)
+
+
+def _extract_in_worker(query):
+    """Extract info inside a pool worker and return a picklable dict."""
+    info = _worker_ytdl.extract_info(query, download=False)
+    return _worker_ytdl.sanitize_info(info)
+
+
+class ExtractionService:
+    """
+    Awaitable wrapper around yt-dlp's blocking extract_info.
+
+    Args:
+        ytdl_options: Options used to build YoutubeDL instances
+        ytdl: Shared YoutubeDL instance used in thread mode (built from ytdl_options if omitted)
+        mode: 'thread' to share one YoutubeDL across threads, 'process' for one per worker process
+        max_workers: Size of the worker pool
+        per_guild_limit: Max extractions a single guild may have running at once
+        per_guild_playlists: Max playlists a single guild may be paging through at once
+        metrics: Optional Metrics that times each extraction per host
+    """
+
+    def __init__(self, ytdl_options, ytdl=None, mode='thread', max_workers=4, per_guild_limit=2, per_guild_playlists=1, metrics=None):
+        if mode not in ('thread', 'process'):
+            raise ValueError(f"Unknown extractor mode: {mode}")
+        self.ytdl_options = dict(ytdl_options)
+        self.ytdl = ytdl
+        self.mode = mode
+        self.max_workers = max_workers
+        self.per_guild_limit = per_guild_limit
+        self.per_guild_playlists = per_guild_playlists
+        self.metrics = metrics
+        self._executor = None
+        self._playlist_executor = None
+        self._flat_ytdl = None
+        self._guild_limits = {}
+        self._playlist_limits = {}
+        self._in_flight = {}
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.mode == 'process':
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_init_worker,
+                    initargs=(self.ytdl_options,)
+                )
+            else:
+                if self.ytdl is None:
+                    self.ytdl = build_ytdl(self.ytdl_options)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="ytdl"
+                )
+        return self._executor
+
+    def _guild_limit(self, guild_id):
+        limit = self._guild_limits.get(guild_id)
+        if limit is None:
+            limit = asyncio.Semaphore(self.per_guild_limit)
+            self._guild_limits[guild_id] = limit
+        return limit
+
+    def _playlist_limit(self, guild_id):
+        limit = self._playlist_limits.get(guild_id)
+        if limit is None:
+            limit = asyncio.Semaphore(self.per_guild_playlists)
+            self._playlist_limits[guild_id] = limit
+        return limit
+
+    def _extract_sync(self, query):
+        return self.ytdl.extract_info(query, download=False)
+
+    async def _run(self, query, guild_id):
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        job = _extract_in_worker if self.mode == 'process' else self._extract_sync
+        # Search queries ("ytsearch:...") have no host of their own
+        host = urlparse(query).hostname or 'www.youtube.com'
+        async with self._guild_limit(guild_id):
+            with self.metrics.time_upstream(host) if self.metrics is not None else nullcontext():
+                return await loop.run_in_executor(executor, job, query)
+
+    def _forget(self, query, task):
+        if self._in_flight.get(query) is task:
+            del self._in_flight[query]
+        # Mark the exception as retrieved even if every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def extract(self, query, guild_id=None):
+        """
+        Extract info for a URL or search query without blocking the event loop.
+        Identical queries already in flight share one extraction.
+
+        Args:
+            query: URL or yt-dlp search string (e.g. "ytsearch:...")
+            guild_id: Guild the request is for, used for the per-guild cap
+
+        Returns:
+            dict: yt-dlp info dict
+        """
+        task = self._in_flight.get(query)
+        if task is None:
+            task = asyncio.ensure_future(self._run(query, guild_id))
+            self._in_flight[query] = task
+            task.add_done_callback(lambda t: self._forget(query, t))
+        # Shield so one caller giving up doesn't cancel the lookup for the others
+        return await asyncio.shield(task)
+
+    def _iter_playlist(self, url, loop, queue, stop, limit):
+        """Walk a playlist's entries lazily in a worker thread, handing each one to the loop."""
+        try:
+            result = self._flat_ytdl.extract_info(url, download=False, process=False)
+            # A watch?v=...&list=... URL resolves to a pointer at the playlist first
+            for _ in range(3):
+                if result.get('_type') not in ('url', 'url_transparent'):
+                    break
+                result = self._flat_ytdl.extract_info(result['url'], download=False, process=False)
+
+            entries = result.get('entries') if result.get('_type') == 'playlist' else [result]
+            count = 0
+            for entry in entries or ():
+                if stop.is_set() or (limit and count >= limit):
+                    break
+                if entry:
+                    loop.call_soon_threadsafe(queue.put_nowait, entry)
+                    count += 1
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+
+    async def stream_playlist(self, url, guild_id=None, limit=None):
+        """
+        Yield a playlist's entries as yt-dlp pages through it, without resolving any streams.
+        Entries are flat dicts (url, title, duration when the site provides them).
+
+        Args:
+            url: Playlist URL
+            guild_id: Guild the request is for, used for the per-guild playlist cap
+            limit: Stop after this many entries
+        """
+        # Generators can't cross process boundaries, so playlists always page on a thread
+        if self._playlist_executor is None:
+            self._playlist_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ytdl-playlist")
+            self._flat_ytdl = build_ytdl(dict(
+                self.ytdl_options,
+                noplaylist=False,
+                extract_flat='in_playlist',
+                lazy_playlist=True
+            ))
+
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        stop = threading.Event()
+        # Playlists have their own cap: the consumer resolves songs through extract() while this
+        # generator is suspended, and those need the guild's extraction slots to be free
+        async with self._playlist_limit(guild_id):
+            worker = loop.run_in_executor(self._playlist_executor, self._iter_playlist, url, loop, queue, stop, limit)
+            try:
+                while True:
+                    entry = await queue.get()
+                    if entry is None:
+                        return
+                    if isinstance(entry, Exception):
+                        raise entry
+                    yield entry
+            finally:
+                # Tell the worker to stop paging if the consumer gave up early, and hold the guild's
+                # slot until it actually has (cancel() only helps if it never started)
+                stop.set()
+                worker.cancel()
+                result, = await asyncio.gather(worker, return_exceptions=True)
+                if isinstance(result, Exception):
+                    print(f"Playlist worker error: {str(result)}")
+
+    def in_flight(self):
+        """Number of distinct extractions currently running or waiting."""
+        return len(self._in_flight)
+
+    def shutdown(self):
+        """Stop the worker pool (pending extractions are cancelled)."""
+        for executor in (self._executor, self._playlist_executor):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._playlist_executor = None
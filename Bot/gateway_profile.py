@@ -0,0 +1,61 @@
+# Gateway profile
+# Picks gateway intents and the member cache policy from the commands that are enabled, so the bot
+# only receives and caches what some command actually uses. Every command is a slash command, so
+# none of them need message content, and most only ever see members who are in voice.
+import discord
+
+PROFILES = ('lean', 'full')
+
+# Intents that individual commands need on top of the lean baseline
+COMMAND_INTENTS = {
+    # Keeps members cached while they're out of voice, so permamutes follow them around the server
+    'permamute': ('members',),
+}
+
+
+def gateway_options(profile='lean', disabled_commands=()):
+    """
+    Client keyword arguments for a gateway profile.
+
+    Args:
+        profile: 'lean' (only what the enabled commands need) or 'full' (the old behaviour: message
+                 content, every member cached and every guild chunked at startup)
+        disabled_commands: Names of slash commands that are turned off (their intents are left out)
+
+    Returns:
+        dict: intents, member_cache_flags and chunk_guilds_at_startup
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown gateway profile: {profile}")
+
+    if profile == 'full':
+        intents = discord.Intents.default()
+        intents.message_content = True
+        intents.members = True
+        intents.voice_states = True
+        return {
+            'intents': intents,
+            'member_cache_flags': discord.MemberCacheFlags.from_intents(intents),
+            'chunk_guilds_at_startup': True,
+        }
+
+    # Guild and channel state plus voice states; interactions arrive regardless of intents
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.voice_states = True
+    for command, needed in COMMAND_INTENTS.items():
+        if command not in disabled_commands:
+            for intent in needed:
+                setattr(intents, intent, True)
+
+    # Cache members in voice (music, /screechkick) and, only if /permamute needs it, everyone who joins
+    member_cache_flags = discord.MemberCacheFlags.none()
+    member_cache_flags.voice = True
+    member_cache_flags.joined = intents.members
+
+    return {
+        'intents': intents,
+        'member_cache_flags': member_cache_flags,
+        # Members are fetched as events and interactions bring them in, never all at once
+        'chunk_guilds_at_startup': False,
+    }
@@ -0,0 +1,99 @@
+# Shared HTTP client
+# One pooled aiohttp session for every command, so requests reuse keep-alive connections
+# instead of paying TCP and TLS setup each time.
+import aiohttp
+
+
+class HttpClient:
+    """
+    Owns the bot's aiohttp session. Call start() once the event loop is running and close() on shutdown.
+
+    Args:
+        limit: Max open connections in total
+        limit_per_host: Max open connections to any single host
+        dns_cache_ttl: Seconds to cache DNS lookups
+        timeout: Default total timeout per request, in seconds (per-call timeouts override it)
+        connect_timeout: Default timeout for establishing a connection, in seconds
+        trace_configs: Optional aiohttp TraceConfigs attached to the session (e.g. request timing)
+    """
+
+    def __init__(self, limit=100, limit_per_host=10, dns_cache_ttl=300, timeout=15, connect_timeout=5, trace_configs=None):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.trace_configs = trace_configs
+        self._session = None
+
+    async def start(self):
+        if self._session is not None and not self._session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            enable_cleanup_closed=True
+        )
+        self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout, trace_configs=self.trace_configs)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            raise RuntimeError("HTTP client used before start()")
+        return self._session
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        """Raw session.get, for callers that want to stream the response themselves."""
+        kwargs = {'params': params, 'headers': headers}
+        # aiohttp treats timeout=None as "no timeout", so only override the default when given
+        if timeout is not None:
+            kwargs['timeout'] = aiohttp.ClientTimeout(total=timeout)
+        return self.session.get(url, **kwargs)
+
+    async def get_json(self, url, params=None, headers=None, timeout=None):
+        """
+        GET a URL and decode the JSON body.
+
+        Returns:
+            tuple: (HTTP status, decoded JSON or None if the body isn't JSON)
+        """
+        async with self.get(url, params=params, headers=headers, timeout=timeout) as response:
+            try:
+                data = await response.json(content_type=None)
+            except ValueError:
+                data = None
+            return response.status, data
+
+    async def get_bytes(self, url, params=None, headers=None, timeout=None):
+        """
+        GET a URL and read the whole body.
+
+        Returns:
+            tuple: (HTTP status, body bytes)
+        """
+        async with self.get(url, params=params, headers=headers, timeout=timeout) as response:
+            return response.status, await response.read()
+
+    async def download(self, url, max_bytes=None, chunk_size=65536, timeout=None):
+        """
+        Stream a response body in chunks, stopping early if it grows past max_bytes.
+
+        Returns:
+            tuple: (HTTP status, body bytes or None if it was too large)
+        """
+        async with self.get(url, timeout=timeout) as response:
+            if response.status != 200:
+                return response.status, b''
+            if max_bytes and (response.content_length or 0) > max_bytes:
+                return response.status, None
+            body = bytearray()
+            async for chunk in response.content.iter_chunked(chunk_size):
+                body.extend(chunk)
+                if max_bytes and len(body) > max_bytes:
+                    return response.status, None
+            return response.status, bytes(body)
@@ -0,0 +1,282 @@
+# Image generation job queue
+# Runs /imagine requests as async Replicate predictions behind global and per-user
+# concurrency caps, handing out slots round-robin so one user can't starve the rest.
+import asyncio, time
+from collections import OrderedDict, deque
+from contextlib import nullcontext
+
+TERMINAL_STATUSES = ('succeeded', 'failed', 'canceled')
+
+
+class ImageGenerationError(Exception):
+    """The backend couldn't produce an image."""
+
+
+class ImageQueueFull(Exception):
+    """The user already has the maximum number of images waiting."""
+
+
+def first_output_url(output):
+    """Pull an image URL out of a prediction's output (a URL, a list of URLs, or file objects)."""
+    if isinstance(output, (list, tuple)):
+        output = output[0] if output else None
+    if output is None:
+        return None
+    return getattr(output, 'url', None) or str(output)
+
+
+class ReplicateBackend:
+    """
+    Generates images with async Replicate predictions.
+    Completion is detected by polling, or sooner when notify() is fed a webhook payload.
+
+    Args:
+        api_token: Replicate API token (the replicate client is built on the first job)
+        model: Model name, e.g. "stability-ai/stable-diffusion-3"
+        poll_interval: Seconds between status checks
+        timeout: Cancel predictions that run longer than this many seconds
+        webhook_url: Optional public URL Replicate should POST completion events to (routed to /webhooks/replicate)
+        metrics: Optional Metrics that times each Replicate API call
+    """
+
+    def __init__(self, api_token, model="stability-ai/stable-diffusion-3", poll_interval=1.0, timeout=300, webhook_url=None, metrics=None):
+        self.api_token = api_token
+        self._client = None
+        self.model = model
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.webhook_url = webhook_url
+        self.metrics = metrics
+        self._waiters = {}
+
+    def notify(self, payload):
+        """
+        Wake the job waiting on a prediction (registered as the 'replicate' webhook on the metrics server).
+        The job reloads the prediction from Replicate, so a payload only decides when it looks.
+        """
+        event = self._waiters.get(payload.get('id'))
+        if event is not None:
+            event.set()
+
+    def _timed(self):
+        return self.metrics.time_upstream('api.replicate.com') if self.metrics is not None else nullcontext()
+
+    @property
+    def client(self):
+        if self._client is None:
+            import replicate
+            self._client = replicate.Client(api_token=self.api_token)
+        return self._client
+
+    async def generate(self, prompt):
+        params = {}
+        if self.webhook_url:
+            params = {'webhook': self.webhook_url, 'webhook_events_filter': ['completed']}
+        with self._timed():
+            prediction = await self.client.predictions.async_create(
+                model=self.model,
+                input={
+                    "prompt": prompt,
+                    "output_format": "png",
+                    "aspect_ratio": "1:1"
+                },
+                **params
+            )
+
+        event = self._waiters[prediction.id] = asyncio.Event()
+        deadline = time.monotonic() + self.timeout
+        try:
+            while prediction.status not in TERMINAL_STATUSES:
+                if time.monotonic() > deadline:
+                    with self._timed():
+                        await prediction.async_cancel()
+                    raise ImageGenerationError("Image generation timed out")
+                try:
+                    await asyncio.wait_for(event.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                event.clear()
+                with self._timed():
+                    await prediction.async_reload()
+        finally:
+            self._waiters.pop(prediction.id, None)
+
+        if prediction.status != 'succeeded':
+            raise ImageGenerationError(prediction.error or f"Prediction {prediction.status}")
+        image_url = first_output_url(prediction.output)
+        if not image_url:
+            raise ImageGenerationError("No image was generated")
+        return image_url
+
+
+class FakeReplicateBackend:
+    """
+    Offline stand-in for ReplicateBackend: waits `delay` seconds, then returns `image_url`
+    (or raises if `fail` is set). Prompts it was asked for are kept in `prompts`.
+    """
+
+    def __init__(self, delay=0.5, image_url="https://placehold.co/1024x1024.png", fail=False):
+        self.delay = delay
+        self.image_url = image_url
+        self.fail = fail
+        self.prompts = []
+
+    def notify(self, payload):
+        pass
+
+    async def generate(self, prompt):
+        self.prompts.append(prompt)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ImageGenerationError("Fake backend failure")
+        return self.image_url
+
+
+class ImageJob:
+    __slots__ = ('user_id', 'prompt', 'future', 'on_position', 'last_position', 'report_task')
+
+    def __init__(self, user_id, prompt, future, on_position):
+        self.user_id = user_id
+        self.prompt = prompt
+        self.future = future
+        self.on_position = on_position
+        self.last_position = None
+        self.report_task = None
+
+
+class ImageJobQueue:
+    """
+    Fair queue in front of an image backend.
+
+    Args:
+        backend: ReplicateBackend or FakeReplicateBackend
+        max_concurrent: Generations running at once across all users
+        per_user_limit: Generations running at once for a single user
+        max_pending_per_user: Jobs a single user may have waiting
+    """
+
+    def __init__(self, backend, max_concurrent=2, per_user_limit=1, max_pending_per_user=3):
+        self.backend = backend
+        self.max_concurrent = max_concurrent
+        self.per_user_limit = per_user_limit
+        self.max_pending_per_user = max_pending_per_user
+        self._pending = OrderedDict()
+        self._running = {}
+        self._running_total = 0
+
+    def is_full(self, user_id):
+        """True if submit() would refuse this user's next job."""
+        jobs = self._pending.get(user_id)
+        return jobs is not None and len(jobs) >= self.max_pending_per_user
+
+    def pending_count(self):
+        return sum(len(jobs) for jobs in self._pending.values())
+
+    def running_count(self):
+        return self._running_total
+
+    def _position(self, job):
+        """1-based position in the round-robin order (0 means running)."""
+        jobs = self._pending.get(job.user_id)
+        if not jobs or job not in jobs:
+            return 0
+        index = jobs.index(job)
+        # Round-robin serves everyone's first job, then everyone's second, and so on
+        position = 1
+        before = True
+        for user_id, queued in self._pending.items():
+            if user_id == job.user_id:
+                before = False
+            position += min(len(queued), index)
+            if before and len(queued) > index:
+                position += 1
+        return position
+
+    async def _call_after(self, previous, callback, position):
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        try:
+            await callback(position)
+        except Exception as e:
+            print(f"Image queue position update error: {str(e)}")
+
+    def _report(self, job, position):
+        if job.on_position is None or job.last_position == position:
+            return
+        job.last_position = position
+        # Chain updates so they reach the user in order
+        job.report_task = asyncio.ensure_future(self._call_after(job.report_task, job.on_position, position))
+
+    def _report_positions(self):
+        for jobs in self._pending.values():
+            for job in jobs:
+                self._report(job, self._position(job))
+
+    def _dispatch(self):
+        """Start as many waiting jobs as the caps allow, taking one user at a time."""
+        started = True
+        while started and self._running_total < self.max_concurrent and self._pending:
+            started = False
+            for user_id in list(self._pending):
+                if self._running_total >= self.max_concurrent:
+                    break
+                if self._running.get(user_id, 0) >= self.per_user_limit:
+                    continue
+                jobs = self._pending[user_id]
+                job = jobs.popleft()
+                # Move this user to the back of the rotation
+                del self._pending[user_id]
+                if jobs:
+                    self._pending[user_id] = jobs
+                self._running[user_id] = self._running.get(user_id, 0) + 1
+                self._running_total += 1
+                self._report(job, 0)
+                asyncio.ensure_future(self._run(job))
+                started = True
+        self._report_positions()
+
+    async def _run(self, job):
+        try:
+            if not job.future.done():
+                job.future.set_result(await self.backend.generate(job.prompt))
+        except Exception as e:
+            if not job.future.done():
+                job.future.set_exception(e)
+        finally:
+            self._running[job.user_id] -= 1
+            if not self._running[job.user_id]:
+                del self._running[job.user_id]
+            self._running_total -= 1
+            self._dispatch()
+
+    async def submit(self, user_id, prompt, on_position=None):
+        """
+        Queue an image and wait for it.
+
+        Args:
+            user_id: Requesting user's ID (caps and fairness are per user)
+            prompt: Text prompt
+            on_position: Optional coroutine function called with the job's queue position
+                         whenever it changes (0 once generation has started)
+
+        Returns:
+            str: URL of the generated image
+        """
+        if self.is_full(user_id):
+            raise ImageQueueFull(f"You already have {len(self._pending[user_id])} images waiting")
+
+        job = ImageJob(user_id, prompt, asyncio.get_running_loop().create_future(), on_position)
+        self._pending.setdefault(user_id, deque()).append(job)
+        self._dispatch()
+        try:
+            return await job.future
+        finally:
+            # Drop the job if the caller gave up before it started
+            jobs = self._pending.get(user_id)
+            if jobs is not None and job in jobs:
+                jobs.remove(job)
+                if not jobs:
+                    del self._pending[user_id]
+                self._report_positions()
+            if job.report_task is not None:
+                await asyncio.gather(job.report_task, return_exceptions=True)
@@ -0,0 +1,236 @@
+# Meme renderer
+# Keeps meme templates in memory, loads each font size once and caches finished PNGs,
+# so repeated /memegen calls skip the download, the font probing and the PNG encode.
+# The drawing itself is a picklable MemeRenderRequest that runs in the render pool, which is
+# also the only place Pillow gets imported.
+import asyncio, os
+from collections import OrderedDict
+from functools import lru_cache
+from io import BytesIO
+
+from render_pool import DEFAULT_MAX_PIXELS, check_pixels
+
+# Popular meme templates
+MEME_TEMPLATES = {
+    "drake": "https://i.imgflip.com/30b1gx.jpg",
+    "distracted": "https://i.imgflip.com/1ur9b0.jpg",
+    "doge": "https://i.imgflip.com/4t0m5.jpg",
+    "expanding": "https://i.imgflip.com/26am.jpg",
+    "change": "https://i.imgflip.com/24y43o.jpg",
+    "button": "https://i.imgflip.com/1g8my4.jpg",
+    "this": "https://i.imgflip.com/261o3j.jpg",
+    "patrick": "https://i.imgflip.com/26am.jpg",
+    "roll": "https://i.imgflip.com/1bhk.jpg",
+    "tuxedo": "https://i.imgflip.com/30b1gx.jpg"
+}
+DEFAULT_TEMPLATE = "drake"
+
+FONT_PATHS = (
+    "/System/Library/Fonts/Helvetica.ttc",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+)
+FONT_SIZE = 40
+STROKE_WIDTH = 2
+MARGIN = 20
+# Decoded templates kept by each process that renders memes
+DECODED_TEMPLATES = 16
+
+_decoded = OrderedDict()
+
+
+class TemplateError(Exception):
+    """A meme template couldn't be loaded."""
+
+
+@lru_cache(maxsize=8)
+def load_font(size=FONT_SIZE):
+    """Load the first available caption font at a size (once per size)."""
+    from PIL import ImageFont
+    for path in FONT_PATHS:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def resolve_template(name):
+    """Map a template name to its canonical name, falling back to the default."""
+    name = (name or "").lower()
+    return name if name in MEME_TEMPLATES else DEFAULT_TEMPLATE
+
+
+def decode_template(data, max_pixels=DEFAULT_MAX_PIXELS):
+    """Decode template bytes into an RGB image, refusing images over the pixel limit."""
+    from PIL import Image
+    img = Image.open(BytesIO(data))
+    # Image.open only reads the header, so the size is known before the pixels are decoded
+    check_pixels(*img.size, max_pixels)
+    img.load()
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    return img
+
+
+def decoded_template(key, data, max_pixels=DEFAULT_MAX_PIXELS):
+    """Decoded template from this process's LRU, decoding it on first use."""
+    img = _decoded.get(key)
+    if img is not None:
+        _decoded.move_to_end(key)
+        return img
+    img = _decoded[key] = decode_template(data, max_pixels)
+    while len(_decoded) > DECODED_TEMPLATES:
+        _decoded.popitem(last=False)
+    return img
+
+
+def draw_captions(template, top_text, bottom_text, font=None):
+    """
+    Draw outlined captions onto a copy of a template.
+
+    Returns:
+        bytes: PNG-encoded meme
+    """
+    from PIL import ImageDraw
+    img = template.copy()
+    draw = ImageDraw.Draw(img)
+    font = font or load_font()
+    width, height = img.size
+
+    for text, at_top in ((top_text, True), (bottom_text, False)):
+        if not text:
+            continue
+        bbox = draw.textbbox((0, 0), text, font=font, stroke_width=STROKE_WIDTH)
+        text_width = bbox[2] - bbox[0]
+        text_height = bbox[3] - bbox[1]
+        x = (width - text_width) // 2
+        y = MARGIN if at_top else height - text_height - MARGIN
+        draw.text((x, y), text, font=font, fill='white', stroke_width=STROKE_WIDTH, stroke_fill='black')
+
+    output = BytesIO()
+    img.save(output, format='PNG')
+    return output.getvalue()
+
+
+class MemeRenderRequest:
+    """Picklable render job: captions drawn onto a template, returned as PNG bytes."""
+
+    __slots__ = ('template_key', 'template_data', 'top_text', 'bottom_text')
+
+    def __init__(self, template_key, template_data, top_text, bottom_text):
+        self.template_key = template_key
+        self.template_data = template_data
+        self.top_text = top_text
+        self.bottom_text = bottom_text
+
+    def render(self, max_pixels=DEFAULT_MAX_PIXELS):
+        template = decoded_template(self.template_key, self.template_data, max_pixels)
+        return draw_captions(template, self.top_text, self.bottom_text)
+
+
+class MemeRenderer:
+    """
+    Template and output cache for /memegen.
+
+    Args:
+        http_client: Shared HttpClient used to fetch templates
+        render_pool: RenderPool the drawing runs in (rendered on the event loop if omitted)
+        max_templates: Template images kept in memory (encoded; render workers keep decoded copies)
+        max_rendered_bytes: Total size of cached PNGs
+        template_dir: Optional folder of bundled templates (<name>.jpg or .png), checked before downloading
+    """
+
+    def __init__(self, http_client, render_pool=None, max_templates=16, max_rendered_bytes=32 * 1024 * 1024, template_dir=None):
+        self.http_client = http_client
+        self.render_pool = render_pool
+        self.max_templates = max_templates
+        self.max_rendered_bytes = max_rendered_bytes
+        self.template_dir = template_dir
+        self.template_hits = 0
+        self.render_hits = 0
+        self._templates = OrderedDict()
+        self._rendered = OrderedDict()
+        self._rendered_bytes = 0
+        self._loading = {}
+
+    def _bundled(self, name):
+        if not self.template_dir:
+            return None
+        for ext in ('.jpg', '.png'):
+            path = os.path.join(self.template_dir, name + ext)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    return f.read()
+        return None
+
+    async def _load_template(self, name):
+        data = self._bundled(name)
+        if data is None:
+            status, data = await self.http_client.get_bytes(MEME_TEMPLATES[name])
+            if status != 200:
+                raise TemplateError(f"Template download failed (HTTP {status})")
+        return data
+
+    async def template(self, name):
+        """Encoded template image for a canonical template name."""
+        # Templates that share an image share a cache entry
+        key = MEME_TEMPLATES[name]
+        data = self._templates.get(key)
+        if data is not None:
+            self._templates.move_to_end(key)
+            self.template_hits += 1
+            return data
+
+        task = self._loading.get(key)
+        if task is None:
+            task = self._loading[key] = asyncio.ensure_future(self._load_template(name))
+            task.add_done_callback(lambda _: self._loading.pop(key, None))
+        data = await asyncio.shield(task)
+
+        self._templates[key] = data
+        self._templates.move_to_end(key)
+        while len(self._templates) > self.max_templates:
+            self._templates.popitem(last=False)
+        return data
+
+    def _remember(self, key, png):
+        if len(png) > self.max_rendered_bytes:
+            return
+        self._rendered[key] = png
+        self._rendered_bytes += len(png)
+        while self._rendered_bytes > self.max_rendered_bytes:
+            _, evicted = self._rendered.popitem(last=False)
+            self._rendered_bytes -= len(evicted)
+
+    async def render(self, template_name, top_text, bottom_text=None):
+        """
+        Render (or fetch from cache) a meme.
+
+        Returns:
+            bytes: PNG-encoded meme
+        """
+        name = resolve_template(template_name)
+        key = (MEME_TEMPLATES[name], top_text or "", bottom_text or "")
+        png = self._rendered.get(key)
+        if png is not None:
+            self._rendered.move_to_end(key)
+            self.render_hits += 1
+            return png
+
+        request = MemeRenderRequest(key[0], await self.template(name), top_text, bottom_text)
+        if self.render_pool is None:
+            png = request.render()
+        else:
+            png = await self.render_pool.render(request)
+        if key not in self._rendered:
+            self._remember(key, png)
+        return png
+
+    def stats(self):
+        return {
+            'templates': len(self._templates),
+            'template_hits': self.template_hits,
+            'rendered': len(self._rendered),
+            'rendered_bytes': self._rendered_bytes,
+            'render_hits': self.render_hits,
+        }
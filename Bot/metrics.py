@@ -0,0 +1,260 @@
+# Metrics
+# Per-command latency histograms and error counts, upstream HTTP timings per host, gateway latency
+# and the stats() counters of the shared services, served in the Prometheus text format on a
+# local /metrics endpoint. The same server takes webhook callbacks on /webhooks/<name>.
+import bisect, math, time
+from contextlib import contextmanager
+
+import aiohttp
+import discord
+from discord import app_commands
+
+COMMAND_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+HTTP_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFERRED = (discord.InteractionResponseType.deferred_channel_message, discord.InteractionResponseType.deferred_message_update)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(labels):
+    return ','.join(
+        f'{name}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in labels
+    )
+
+
+class Metrics:
+    """
+    Collects the bot's metrics. Call start() from setup_hook and close() on shutdown.
+
+    Args:
+        host: Interface the /metrics endpoint listens on
+        port: Port for the /metrics endpoint, or None to collect without serving them
+    """
+
+    def __init__(self, host='127.0.0.1', port=None):
+        self.host = host
+        self.port = port
+        self.client = None
+        self._command_latency = {}
+        self._interaction_delay = Histogram(COMMAND_BUCKETS)
+        self._command_errors = {}
+        self._http_latency = {}
+        self._http_responses = {}
+        self._http_errors = {}
+        self._stats = {}
+        self._webhooks = {}
+        self._runner = None
+
+    async def start(self, client):
+        """Start serving /metrics (aiohttp.web is only imported when a port is set)."""
+        self.client = client
+        if self.port is None or self._runner is not None:
+            return
+        from aiohttp import web
+        app = web.Application()
+        app.router.add_get('/metrics', self._handle)
+        app.router.add_post('/webhooks/{name}', self._handle_webhook)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def add_stats(self, component, stats):
+        """Expose a component's stats() dict as bot_<component>_<key> gauges."""
+        self._stats[component] = stats
+
+    def remove_stats(self, component):
+        self._stats.pop(component, None)
+
+    def add_webhook(self, name, handler):
+        """Call handler(payload) with the JSON body of every POST to /webhooks/<name>."""
+        self._webhooks[name] = handler
+
+    def remove_webhook(self, name):
+        self._webhooks.pop(name, None)
+
+    # ---- commands ----
+    def command_started(self, interaction):
+        interaction.extras['started_at'] = time.monotonic()
+        # Time from Discord creating the interaction to us handling it: gateway delivery plus our own loop
+        delay = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+        self._interaction_delay.observe(max(delay, 0.0))
+
+    def command_finished(self, interaction):
+        """Record how long the command took; for deferred commands that's until the followup went out."""
+        started_at = interaction.extras.get('started_at')
+        if started_at is None or interaction.command is None:
+            return
+        key = (interaction.command.qualified_name, 'true' if interaction.response.type in DEFERRED else 'false')
+        histogram = self._command_latency.get(key)
+        if histogram is None:
+            histogram = self._command_latency[key] = Histogram(COMMAND_BUCKETS)
+        histogram.observe(time.monotonic() - started_at)
+
+    def command_error(self, interaction, error):
+        """Count an error a command hit, whether it handled it or not."""
+        command = interaction.command.qualified_name if interaction.command is not None else 'unknown'
+        key = (command, type(error).__name__)
+        self._command_errors[key] = self._command_errors.get(key, 0) + 1
+
+    # ---- upstream HTTP ----
+    def _observe_http(self, host, started_at):
+        histogram = self._http_latency.get(host)
+        if histogram is None:
+            histogram = self._http_latency[host] = Histogram(HTTP_BUCKETS)
+        histogram.observe(time.monotonic() - started_at)
+
+    def _count_http_error(self, host, error):
+        key = (host, type(error).__name__)
+        self._http_errors[key] = self._http_errors.get(key, 0) + 1
+
+    @contextmanager
+    def time_upstream(self, host):
+        """
+        Time an upstream call made outside the shared session (Replicate, Giphy, translation, yt-dlp)
+        in the same per-host histogram. Use it on the event loop, around the await of a worker call.
+        """
+        started_at = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self._count_http_error(host, e)
+            raise
+        self._observe_http(host, started_at)
+
+    def trace_config(self):
+        """An aiohttp TraceConfig that times every request made through the session it's given to."""
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            context.started_at = time.monotonic()
+
+        async def on_request_end(session, context, params):
+            host = params.url.host
+            self._observe_http(host, context.started_at)
+            key = (host, params.response.status)
+            self._http_responses[key] = self._http_responses.get(key, 0) + 1
+
+        async def on_request_exception(session, context, params):
+            self._count_http_error(params.url.host, params.exception)
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+        return trace
+
+    # ---- exposition ----
+    def render(self):
+        """Every metric in the Prometheus text format."""
+        lines = []
+
+        def histogram(name, help, series):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, hist in series:
+                cumulative = 0
+                for bound, count in zip(hist.buckets + (math.inf,), hist.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == math.inf else repr(bound)
+                    lines.append(f"{name}_bucket{{{_labels(labels + (('le', le),))}}} {cumulative}")
+                suffix = f"{{{_labels(labels)}}}" if labels else ""
+                lines.append(f"{name}_sum{suffix} {hist.sum}")
+                lines.append(f"{name}_count{suffix} {hist.count}")
+
+        def counter(name, help, label_names, values):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} counter")
+            for key, value in values.items():
+                lines.append(f"{name}{{{_labels(zip(label_names, key))}}} {value}")
+
+        histogram('bot_command_latency_seconds', "Time from a command starting until it finished (deferred: until its followup was sent).",
+                  [((('command', command), ('deferred', deferred)), hist) for (command, deferred), hist in sorted(self._command_latency.items())])
+        histogram('bot_interaction_delay_seconds', "Time from Discord creating an interaction until its command started.",
+                  [((), self._interaction_delay)])
+        counter('bot_command_errors_total', "Errors hit while running commands, by exception type.",
+                ('command', 'type'), self._command_errors)
+        histogram('bot_http_request_duration_seconds', "Upstream API time by host (shared session: until response headers arrived).",
+                  [((('host', host),), hist) for host, hist in sorted(self._http_latency.items())])
+        counter('bot_http_responses_total', "Upstream API responses by host and status.",
+                ('host', 'status'), self._http_responses)
+        counter('bot_http_errors_total', "Upstream API requests that failed without a response, by host and exception type.",
+                ('host', 'type'), self._http_errors)
+
+        if self.client is not None:
+            lines.append("# HELP bot_gateway_latency_seconds Gateway heartbeat latency per shard.")
+            lines.append("# TYPE bot_gateway_latency_seconds gauge")
+            # Only AutoShardedBot has latencies; a plain Bot has a single latency
+            latencies = getattr(self.client, 'latencies', None) or [(None, self.client.latency)]
+            for shard_id, latency in latencies:
+                if math.isfinite(latency):
+                    lines.append(f"bot_gateway_latency_seconds{{{_labels((('shard', shard_id if shard_id is not None else 0),))}}} {latency}")
+            lines.append("# TYPE bot_guilds gauge")
+            lines.append(f"bot_guilds {len(self.client.guilds)}")
+
+        for component, stats in list(self._stats.items()):
+            try:
+                values = stats()
+            except Exception as e:
+                print(f"Metrics error: {str(e)}")
+                continue
+            for key, value in values.items():
+                name = f"bot_{component}_{key}"
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    async def _handle(self, request):
+        from aiohttp import web
+        return web.Response(text=self.render(), content_type='text/plain', charset='utf-8')
+
+    async def _handle_webhook(self, request):
+        from aiohttp import web
+        handler = self._webhooks.get(request.match_info['name'])
+        if handler is None:
+            return web.Response(status=404)
+        try:
+            payload = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+        if not isinstance(payload, dict):
+            return web.Response(status=400)
+        try:
+            handler(payload)
+        except Exception as e:
+            print(f"Webhook error: {str(e)}")
+            return web.Response(status=500)
+        return web.Response(status=204)
+
+
+class InstrumentedCommandTree(app_commands.CommandTree):
+    """CommandTree that times every slash command and counts the errors it doesn't handle (uses client.metrics)."""
+
+    async def interaction_check(self, interaction):
+        # Autocomplete runs on every keystroke and isn't a command run
+        if interaction.type != discord.InteractionType.autocomplete:
+            self.client.metrics.command_started(interaction)
+        return True
+
+    async def on_error(self, interaction, error):
+        metrics = self.client.metrics
+        metrics.command_error(interaction, getattr(error, 'original', error))
+        metrics.command_finished(interaction)
+        await super().on_error(interaction, error)
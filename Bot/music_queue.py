@@ -0,0 +1,124 @@
+# Per-guild music queue
+# Deque-backed so enqueue/dequeue stay O(1) even with playlist-sized queues.
+import asyncio, random
+from collections import deque
+from itertools import islice
+
+LOOP_OFF = 'off'
+LOOP_TRACK = 'track'
+LOOP_QUEUE = 'queue'
+LOOP_MODES = (LOOP_OFF, LOOP_TRACK, LOOP_QUEUE)
+
+
+class Track:
+    """A queued song. url is the stable page URL; the stream URL is resolved at play time."""
+    __slots__ = ('url', 'title', 'duration')
+
+    def __init__(self, url, title, duration=0):
+        self.url = url
+        self.title = title
+        self.duration = duration
+
+
+class GuildMusicQueue:
+    """
+    Upcoming songs for one guild plus the song currently playing.
+
+    Plain methods never await, so they're atomic on the event loop. Hold `lock`
+    around multi-step sequences that do await (e.g. dequeue -> resolve -> play).
+    """
+
+    def __init__(self, guild_id):
+        self.guild_id = guild_id
+        self.current = None
+        self.loop_mode = LOOP_OFF
+        self.lock = asyncio.Lock()
+        # Bumped on clear() so long-running producers (playlist ingestion) know to stop
+        self.generation = 0
+        self._tracks = deque()
+        self._skip = False
+
+    def __len__(self):
+        return len(self._tracks)
+
+    def __bool__(self):
+        return bool(self._tracks)
+
+    def __iter__(self):
+        return iter(self._tracks)
+
+    def enqueue(self, track):
+        """Add a track to the end of the queue and return its position (1-based)."""
+        self._tracks.append(track)
+        return len(self._tracks)
+
+    def extend(self, tracks):
+        self._tracks.extend(tracks)
+
+    def request_skip(self):
+        """Make the next advance() move on even when looping the current track."""
+        self._skip = True
+
+    def advance(self):
+        """
+        Move to the next track, honouring the loop mode.
+
+        Returns:
+            Track: The new current track, or None when there's nothing left
+        """
+        skip, self._skip = self._skip, False
+        previous = self.current
+        if previous is not None:
+            if self.loop_mode == LOOP_TRACK and not skip:
+                return previous
+            if self.loop_mode == LOOP_QUEUE:
+                self._tracks.append(previous)
+        self.current = self._tracks.popleft() if self._tracks else None
+        return self.current
+
+    def upcoming(self, count):
+        """The next `count` tracks that advance() would produce."""
+        if self.loop_mode == LOOP_TRACK and self.current is not None:
+            return [self.current]
+        tracks = list(islice(self._tracks, count))
+        if self.loop_mode == LOOP_QUEUE and self.current is not None and len(tracks) < count:
+            tracks.append(self.current)
+        return tracks
+
+    def peek(self, count, start=0):
+        """Tracks at positions start..start+count (0-based) without copying the queue."""
+        return list(islice(self._tracks, start, start + count))
+
+    def remove(self, index):
+        """Remove and return the track at a 0-based index."""
+        if not 0 <= index < len(self._tracks):
+            raise IndexError("queue index out of range")
+        # Rotating is O(min(i, n - i)) instead of shifting the whole deque
+        self._tracks.rotate(-index)
+        track = self._tracks.popleft()
+        self._tracks.rotate(index)
+        return track
+
+    def move(self, source, destination):
+        """Move the track at a 0-based index to another 0-based index."""
+        track = self.remove(source)
+        destination = max(0, min(destination, len(self._tracks)))
+        self._tracks.insert(destination, track)
+        return track
+
+    def shuffle(self):
+        tracks = list(self._tracks)
+        random.shuffle(tracks)
+        self._tracks = deque(tracks)
+
+    def set_loop(self, mode):
+        if mode not in LOOP_MODES:
+            raise ValueError(f"Unknown loop mode: {mode}")
+        self.loop_mode = mode
+
+    def clear(self):
+        """Drop every queued song and forget the current one."""
+        self._tracks.clear()
+        self.current = None
+        self._skip = False
+        self.generation += 1
@@ -0,0 +1,163 @@
+# Permamute store
+# Every permamute, keyed by (guild_id, user_id) and persisted to SQLite, with an in-memory set of
+# permamuted user IDs so on_voice_state_update can drop unrelated voice events with one lookup.
+# Re-mutes for a user who keeps toggling their mute are coalesced into one edit per cooldown.
+import asyncio, sqlite3, time
+
+
+class PermamuteStore:
+    """
+    Call start() once the event loop is running and close() on shutdown.
+
+    Args:
+        db_path: SQLite file the permamutes are stored in (':memory:' keeps them for this run only)
+        cooldown: Minimum seconds between re-mutes of the same user; toggles inside the window
+                  are coalesced into one re-mute at the end of it
+        owns: Optional predicate (guild_id) -> bool; only permamutes it accepts are loaded,
+              so processes running different shards can share one database
+    """
+
+    def __init__(self, db_path=':memory:', cooldown=2.0, owns=None):
+        self.cooldown = cooldown
+        self.owns = owns
+        self.seen = 0
+        self.filtered = 0
+        self.acted = 0
+        self.coalesced = 0
+        self.failed = 0
+        self._db = sqlite3.connect(db_path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS permamutes ("
+            "guild_id INTEGER, user_id INTEGER, muted_by INTEGER, created_at REAL, PRIMARY KEY (guild_id, user_id))"
+        )
+        self._db.commit()
+        self._muted = set()
+        self._user_ids = {}
+        self._last_remute = {}
+        self._pending = {}
+
+    def _index(self, key):
+        self._muted.add(key)
+        self._user_ids[key[1]] = self._user_ids.get(key[1], 0) + 1
+
+    def _unindex(self, key):
+        self._muted.discard(key)
+        remaining = self._user_ids.get(key[1], 0) - 1
+        if remaining > 0:
+            self._user_ids[key[1]] = remaining
+        else:
+            self._user_ids.pop(key[1], None)
+
+    def start(self):
+        """Load saved permamutes."""
+        for guild_id, user_id in self._db.execute("SELECT guild_id, user_id FROM permamutes"):
+            key = (guild_id, user_id)
+            if key not in self._muted and (self.owns is None or self.owns(guild_id)):
+                self._index(key)
+
+    async def close(self):
+        pending = list(self._pending.values())
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._pending.clear()
+        self._db.close()
+
+    # ---- permamutes ----
+    def add(self, guild_id, user_id, muted_by=None):
+        """Permamute a user in a guild. Returns False if they already were."""
+        key = (guild_id, user_id)
+        if key in self._muted:
+            return False
+        self._db.execute(
+            "INSERT OR REPLACE INTO permamutes (guild_id, user_id, muted_by, created_at) VALUES (?, ?, ?, ?)",
+            (guild_id, user_id, muted_by, time.time())
+        )
+        self._db.commit()
+        self._index(key)
+        return True
+
+    def remove(self, guild_id, user_id):
+        """Release a user in a guild, dropping any re-mute still waiting. Returns False if they weren't permamuted."""
+        key = (guild_id, user_id)
+        if key not in self._muted:
+            return False
+        self._db.execute("DELETE FROM permamutes WHERE guild_id = ? AND user_id = ?", key)
+        self._db.commit()
+        self._unindex(key)
+        self._last_remute.pop(key, None)
+        task = self._pending.pop(key, None)
+        if task is not None:
+            task.cancel()
+        return True
+
+    def is_permamuted(self, guild_id, user_id):
+        return (guild_id, user_id) in self._muted
+
+    def stats(self):
+        return {
+            'permamuted': len(self._muted),
+            'seen': self.seen,
+            'filtered': self.filtered,
+            'acted': self.acted,
+            'coalesced': self.coalesced,
+            'failed': self.failed,
+        }
+
+    # ---- enforcement ----
+    def needs_remute(self, member, after):
+        """
+        Decide whether a voice state update leaves a permamuted user unmuted.
+        Cheap enough to call for every voice event: unrelated users are rejected by one set lookup.
+
+        Args:
+            member: The member whose voice state changed
+            after: Their new VoiceState
+        """
+        self.seen += 1
+        if member.id not in self._user_ids or (member.guild.id, member.id) not in self._muted:
+            self.filtered += 1
+            return False
+        # Left voice, or still muted: nothing to do
+        if after.channel is None or after.mute:
+            self.filtered += 1
+            return False
+        return True
+
+    def schedule_remute(self, member, remute):
+        """
+        Re-mute a member now, or once the cooldown since their last re-mute has passed.
+        A re-mute already waiting for this member absorbs the call.
+
+        Args:
+            member: The permamuted member
+            remute: Coroutine function called as remute(member) when the member is still
+                    permamuted, in voice and unmuted at the time it runs
+        """
+        key = (member.guild.id, member.id)
+        if key in self._pending:
+            self.coalesced += 1
+            return
+        last = self._last_remute.get(key)
+        delay = 0 if last is None else max(last + self.cooldown - time.monotonic(), 0)
+        self._pending[key] = asyncio.ensure_future(self._remute_after(key, member, remute, delay))
+
+    async def _remute_after(self, key, member, remute, delay):
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+            # Check again: they may have been released, left or re-muted while we waited
+            voice = member.voice
+            if key not in self._muted or voice is None or voice.channel is None or voice.mute:
+                return
+            self._last_remute[key] = time.monotonic()
+            self.acted += 1
+            await remute(member)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failed += 1
+            print(f"Permamute error: {str(e)}")
+        finally:
+            if self._pending.get(key) is asyncio.current_task():
+                del self._pending[key]
@@ -0,0 +1,191 @@
+# Poll engine
+# Button polls with the tally kept in memory. Votes are written to SQLite in batches and each
+# poll's message is re-rendered at most once per update interval, however fast the votes come in.
+import asyncio, json, sqlite3, time
+
+
+class Poll:
+    __slots__ = ('id', 'guild_id', 'channel_id', 'message_id', 'question', 'options', 'created_by', 'created_at',
+                 'counts', 'votes')
+
+    def __init__(self, id, guild_id, channel_id, message_id, question, options, created_by, created_at):
+        self.id = id
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.question = question
+        self.options = options
+        self.created_by = created_by
+        self.created_at = created_at
+        self.counts = [0] * len(options)
+        self.votes = {}
+
+    @property
+    def total(self):
+        return len(self.votes)
+
+
+class PollStore:
+    """
+    Every open poll and its votes. Call start() once the event loop is running and close() on shutdown.
+
+    Args:
+        on_update: Coroutine function called as on_update(poll) to re-render a poll whose tally changed
+        db_path: SQLite file polls are stored in (':memory:' keeps them for this run only)
+        update_interval: Seconds between message updates and vote writes
+        max_age: Seconds a poll stays open; older polls are dropped
+        owns: Optional predicate (guild_id) -> bool; only polls it accepts are loaded,
+              so processes running different shards can share one database
+    """
+
+    def __init__(self, on_update, db_path=':memory:', update_interval=3.0, max_age=30 * 86400, owns=None):
+        self.on_update = on_update
+        self.update_interval = update_interval
+        self.max_age = max_age
+        self.owns = owns
+        self.votes_cast = 0
+        self.updates = 0
+        self._db = sqlite3.connect(db_path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS polls ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, guild_id INTEGER, channel_id INTEGER, message_id INTEGER, "
+            "question TEXT, options TEXT, created_by INTEGER, created_at REAL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS poll_votes ("
+            "poll_id INTEGER, user_id INTEGER, option INTEGER, PRIMARY KEY (poll_id, user_id))"
+        )
+        self._db.commit()
+        self._polls = {}
+        self._latest_in_channel = {}
+        self._dirty = set()
+        self._unsaved = {}
+        self._task = None
+
+    def start(self):
+        """Drop expired polls, load the rest with their tallies and start the update loop."""
+        if self._task is not None:
+            return
+        cutoff = time.time() - self.max_age
+        self._db.execute("DELETE FROM poll_votes WHERE poll_id IN (SELECT id FROM polls WHERE created_at < ?)", (cutoff,))
+        self._db.execute("DELETE FROM polls WHERE created_at < ?", (cutoff,))
+        self._db.commit()
+        for row in self._db.execute(
+            "SELECT id, guild_id, channel_id, message_id, question, options, created_by, created_at FROM polls ORDER BY id"
+        ):
+            if self.owns is None or self.owns(row[1]):
+                self._index(Poll(*row[:5], json.loads(row[5]), *row[6:]))
+        for poll_id, user_id, option in self._db.execute("SELECT poll_id, user_id, option FROM poll_votes"):
+            poll = self._polls.get(poll_id)
+            if poll is not None:
+                poll.votes[user_id] = option
+                poll.counts[option] += 1
+        self._task = asyncio.ensure_future(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._save()
+        self._db.close()
+
+    def _index(self, poll):
+        self._polls[poll.id] = poll
+        self._latest_in_channel[poll.channel_id] = poll.id
+
+    # ---- polls ----
+    def create(self, guild_id, channel_id, question, options, created_by):
+        """Store a new poll; attach() its message once it's been sent."""
+        now = time.time()
+        cursor = self._db.execute(
+            "INSERT INTO polls (guild_id, channel_id, message_id, question, options, created_by, created_at) "
+            "VALUES (?, ?, NULL, ?, ?, ?, ?)",
+            (guild_id, channel_id, question, json.dumps(options), created_by, now)
+        )
+        self._db.commit()
+        poll = Poll(cursor.lastrowid, guild_id, channel_id, None, question, list(options), created_by, now)
+        self._index(poll)
+        return poll
+
+    def attach(self, poll, message_id):
+        poll.message_id = message_id
+        self._db.execute("UPDATE polls SET message_id = ? WHERE id = ?", (message_id, poll.id))
+        self._db.commit()
+
+    def get(self, poll_id):
+        return self._polls.get(poll_id)
+
+    def latest_in_channel(self, channel_id):
+        return self._polls.get(self._latest_in_channel.get(channel_id))
+
+    def stats(self):
+        return {
+            'polls': len(self._polls),
+            'votes_cast': self.votes_cast,
+            'updates': self.updates,
+            'unsaved_votes': len(self._unsaved),
+        }
+
+    # ---- voting ----
+    def vote(self, poll, user_id, option):
+        """
+        Record a vote; voting for the option you already picked takes the vote back.
+
+        Returns:
+            int or None: The user's option now, or None if they retracted their vote
+        """
+        previous = poll.votes.get(user_id)
+        if previous is not None:
+            poll.counts[previous] -= 1
+        if previous == option:
+            del poll.votes[user_id]
+            option = None
+        else:
+            poll.votes[user_id] = option
+            poll.counts[option] += 1
+        self.votes_cast += 1
+        self._unsaved[(poll.id, user_id)] = option
+        self._dirty.add(poll.id)
+        return option
+
+    # ---- background work ----
+    def _save(self):
+        if not self._unsaved:
+            return
+        unsaved, self._unsaved = self._unsaved, {}
+        self._db.executemany(
+            "INSERT OR REPLACE INTO poll_votes (poll_id, user_id, option) VALUES (?, ?, ?)",
+            [(poll_id, user_id, option) for (poll_id, user_id), option in unsaved.items() if option is not None]
+        )
+        self._db.executemany(
+            "DELETE FROM poll_votes WHERE poll_id = ? AND user_id = ?",
+            [key for key, option in unsaved.items() if option is None]
+        )
+        self._db.commit()
+
+    def _expire(self):
+        cutoff = time.time() - self.max_age
+        for poll in [poll for poll in self._polls.values() if poll.created_at < cutoff]:
+            del self._polls[poll.id]
+            if self._latest_in_channel.get(poll.channel_id) == poll.id:
+                del self._latest_in_channel[poll.channel_id]
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.update_interval)
+            try:
+                self._save()
+                self._expire()
+            except Exception as e:
+                print(f"Poll save error: {str(e)}")
+            dirty, self._dirty = self._dirty, set()
+            for poll_id in dirty:
+                poll = self._polls.get(poll_id)
+                if poll is None or poll.message_id is None:
+                    continue
+                try:
+                    await self.on_update(poll)
+                    self.updates += 1
+                except Exception as e:
+                    print(f"Poll update error: {str(e)}")
@@ -0,0 +1,135 @@
+# Music prefetcher
+# Resolves the next queued tracks in the background while the current one plays,
+# so the after-playback callback can start the next song without waiting on yt-dlp.
+import asyncio
+
+
+class PrefetchedTrack:
+    """A resolved upcoming track, with an audio source if it's next in line."""
+    __slots__ = ('track', 'source')
+
+    def __init__(self, track, source=None):
+        self.track = track
+        self.source = source
+
+
+class TrackPrefetcher:
+    """
+    Keeps the next few entries of each guild's queue resolved and ready to play.
+
+    Args:
+        resolve: Coroutine (url, guild_id, min_ttl=...) -> CachedTrack
+        make_source: Callable (track) -> discord.AudioSource
+        depth: How many upcoming entries to resolve ahead of time
+        refresh_margin: Re-resolve entries whose stream URL expires within this many seconds
+        refresh_interval: Seconds between expiry checks
+    """
+
+    def __init__(self, resolve, make_source, depth=2, refresh_margin=600, refresh_interval=60):
+        self.resolve = resolve
+        self.make_source = make_source
+        self.depth = depth
+        self.refresh_margin = refresh_margin
+        self.refresh_interval = refresh_interval
+        self._ready = {}
+        self._upcoming = {}
+        self._tasks = {}
+        self._refresher = None
+
+    def _release(self, entry):
+        if entry.source is not None:
+            entry.source.cleanup()
+            entry.source = None
+
+    def _start(self, guild_id):
+        task = self._tasks.get(guild_id)
+        if task is not None and not task.done():
+            task.cancel()
+        self._tasks[guild_id] = asyncio.ensure_future(self._prefetch(guild_id))
+
+    def schedule(self, guild_id, upcoming):
+        """
+        Tell the prefetcher what's next in a guild's queue.
+
+        Args:
+            guild_id: Discord guild ID
+            upcoming: URLs of the upcoming entries, next one first
+        """
+        upcoming = list(upcoming)[:self.depth]
+        self._upcoming[guild_id] = upcoming
+        ready = self._ready.setdefault(guild_id, {})
+        for url in list(ready):
+            if url not in upcoming:
+                self._release(ready.pop(url))
+
+        if upcoming:
+            self._start(guild_id)
+        if self._refresher is None:
+            self._refresher = asyncio.ensure_future(self._refresh_loop())
+
+    async def _prefetch(self, guild_id):
+        ready = self._ready.setdefault(guild_id, {})
+        for position, url in enumerate(self._upcoming.get(guild_id, ())):
+            entry = ready.get(url)
+            stale = entry is None or entry.track.ttl() < self.refresh_margin
+            # Only the head of the queue gets a live source; the rest just stay resolved
+            if not stale and (position > 0 or entry.source is not None):
+                continue
+            try:
+                if stale:
+                    track = await self.resolve(url, guild_id, min_ttl=self.refresh_margin)
+                else:
+                    track = entry.track
+                source = self.make_source(track) if position == 0 else None
+            except Exception as e:
+                print(f"Prefetch error: {str(e)}")
+                continue
+            if entry is not None:
+                self._release(entry)
+            ready[url] = PrefetchedTrack(track, source)
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            for guild_id, ready in list(self._ready.items()):
+                if any(entry.track.ttl() < self.refresh_margin for entry in ready.values()):
+                    self._start(guild_id)
+
+    def take(self, guild_id, url):
+        """
+        Claim a prefetched entry for playback.
+
+        Returns:
+            tuple: (audio source, CachedTrack) or (None, None) if nothing usable was prefetched
+        """
+        entry = self._ready.get(guild_id, {}).pop(url, None)
+        if entry is None:
+            return None, None
+        if entry.track.ttl() <= 0:
+            self._release(entry)
+            return None, None
+        source = entry.source or self.make_source(entry.track)
+        entry.source = None
+        return source, entry.track
+
+    def clear(self, guild_id):
+        """Drop everything prefetched for a guild (e.g. on /stop or /leave)."""
+        task = self._tasks.pop(guild_id, None)
+        if task is not None:
+            task.cancel()
+        self._upcoming.pop(guild_id, None)
+        for entry in self._ready.pop(guild_id, {}).values():
+            self._release(entry)
+
+    async def close(self):
+        """Stop the background work and release every prepared source (on shutdown or unload)."""
+        tasks = [task for task in self._tasks.values() if not task.done()]
+        if self._refresher is not None:
+            tasks.append(self._refresher)
+            self._refresher = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        for guild_id in list(self._ready):
+            self.clear(guild_id)
@@ -0,0 +1,42 @@
+# QR code renderer
+# Picklable /qrcode job for the render pool: builds the QR matrix and returns PNG bytes.
+from io import BytesIO
+
+from render_pool import DEFAULT_MAX_PIXELS, check_pixels
+
+
+class QRCodeRenderRequest:
+    """
+    Args:
+        text: Data to encode
+        box_size: Pixels per QR module
+        border: Quiet-zone width, in modules
+    """
+
+    __slots__ = ('text', 'box_size', 'border')
+
+    def __init__(self, text, box_size=10, border=4):
+        self.text = text
+        self.box_size = box_size
+        self.border = border
+
+    def render(self, max_pixels=DEFAULT_MAX_PIXELS):
+        # Imported in the render pool worker, so the bot process never loads qrcode
+        import qrcode
+        qr = qrcode.QRCode(
+            version=1,
+            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            box_size=self.box_size,
+            border=self.border,
+        )
+        qr.add_data(self.text)
+        qr.make(fit=True)
+
+        # Check the final size before rasterizing
+        side = (qr.modules_count + 2 * self.border) * self.box_size
+        check_pixels(side, side, max_pixels)
+
+        img = qr.make_image(fill_color="black", back_color="white")
+        output = BytesIO()
+        img.save(output, format='PNG')
+        return output.getvalue()
@@ -0,0 +1,188 @@
+# Reminder scheduler
+# Keeps every pending reminder in one min-heap (persisted to SQLite) with a single dispatcher
+# coroutine that sleeps until the next one is due, instead of one sleeping task per reminder.
+import asyncio, heapq, sqlite3, time
+
+
+class ReminderLimitReached(Exception):
+    """The user already has the maximum number of pending reminders."""
+
+
+class Reminder:
+    __slots__ = ('id', 'user_id', 'guild_id', 'channel_id', 'message', 'due_at', 'created_at')
+
+    def __init__(self, id, user_id, guild_id, channel_id, message, due_at, created_at):
+        self.id = id
+        self.user_id = user_id
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.message = message
+        self.due_at = due_at
+        self.created_at = created_at
+
+
+class ReminderScheduler:
+    """
+    Persistent reminder queue. Call start() once the event loop is running and close() on shutdown.
+
+    Args:
+        deliver: Coroutine function called as deliver(user_id, reminders, late) with all of a
+                 user's reminders that came due together; late is True for ones missed while offline
+        db_path: SQLite file the reminders are stored in (':memory:' keeps them for this run only)
+        max_per_user: Pending reminders a single user may have
+        batch_size: Max reminders combined into one delivery
+        send_interval: Seconds to wait between deliveries, to stay clear of DM rate limits
+        grace: Reminders this many seconds overdue at startup are treated as late
+        owns: Optional predicate (guild_id) -> bool; only reminders it accepts are loaded and delivered,
+              so processes running different shards can share one database
+    """
+
+    def __init__(self, deliver, db_path=':memory:', max_per_user=25, batch_size=10, send_interval=0.5, grace=60,
+                 owns=None):
+        self.deliver = deliver
+        self.owns = owns
+        self.max_per_user = max_per_user
+        self.batch_size = batch_size
+        self.send_interval = send_interval
+        self.grace = grace
+        self.delivered = 0
+        self._db = sqlite3.connect(db_path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS reminders ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, guild_id INTEGER, channel_id INTEGER, "
+            "message TEXT, due_at REAL, created_at REAL)"
+        )
+        self._db.commit()
+        self._reminders = {}
+        self._by_user = {}
+        self._heap = []
+        self._wakeup = None
+        self._task = None
+        self._started_at = None
+
+    def _index(self, reminder):
+        self._reminders[reminder.id] = reminder
+        self._by_user.setdefault(reminder.user_id, set()).add(reminder.id)
+        heapq.heappush(self._heap, (reminder.due_at, reminder.id))
+
+    def _unindex(self, reminder):
+        # The heap entry is left behind and skipped when it surfaces
+        self._reminders.pop(reminder.id, None)
+        ids = self._by_user.get(reminder.user_id)
+        if ids is not None:
+            ids.discard(reminder.id)
+            if not ids:
+                del self._by_user[reminder.user_id]
+
+    def start(self):
+        """Load saved reminders and start the dispatcher."""
+        if self._task is not None:
+            return
+        self._started_at = time.time()
+        self._wakeup = asyncio.Event()
+        for row in self._db.execute("SELECT id, user_id, guild_id, channel_id, message, due_at, created_at FROM reminders"):
+            if row[0] not in self._reminders and (self.owns is None or self.owns(row[2])):
+                self._index(Reminder(*row))
+        self._task = asyncio.ensure_future(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._db.close()
+
+    def add(self, user_id, guild_id, channel_id, message, delay):
+        """
+        Schedule a reminder delay seconds from now.
+
+        Returns:
+            Reminder: The stored reminder (its id is what /cancelreminder takes)
+        """
+        if len(self._by_user.get(user_id, ())) >= self.max_per_user:
+            raise ReminderLimitReached(f"You already have {self.max_per_user} pending reminders")
+
+        now = time.time()
+        cursor = self._db.execute(
+            "INSERT INTO reminders (user_id, guild_id, channel_id, message, due_at, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (user_id, guild_id, channel_id, message, now + delay, now)
+        )
+        self._db.commit()
+        reminder = Reminder(cursor.lastrowid, user_id, guild_id, channel_id, message, now + delay, now)
+        self._index(reminder)
+        # Wake the dispatcher if this is now the soonest reminder
+        if self._wakeup is not None and self._heap[0][1] == reminder.id:
+            self._wakeup.set()
+        return reminder
+
+    def list_for(self, user_id):
+        """A user's pending reminders, soonest first."""
+        reminders = [self._reminders[reminder_id] for reminder_id in self._by_user.get(user_id, ())]
+        return sorted(reminders, key=lambda reminder: reminder.due_at)
+
+    def cancel(self, user_id, reminder_id):
+        """Cancel one of a user's reminders. Returns False if they have no reminder with that id."""
+        reminder = self._reminders.get(reminder_id)
+        if reminder is None or reminder.user_id != user_id:
+            return False
+        self._unindex(reminder)
+        self._db.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
+        self._db.commit()
+        return True
+
+    def pending_count(self):
+        return len(self._reminders)
+
+    def stats(self):
+        return {'pending': self.pending_count(), 'delivered': self.delivered}
+
+    def _pop_due(self, now):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, reminder_id = heapq.heappop(self._heap)
+            reminder = self._reminders.get(reminder_id)
+            if reminder is not None:
+                self._unindex(reminder)
+                due.append(reminder)
+        return due
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            # Drop heap entries of cancelled reminders so they don't set the next wake time
+            while self._heap and self._heap[0][1] not in self._reminders:
+                heapq.heappop(self._heap)
+
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                # Re-check at least once a minute in case the wall clock jumps
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), min(delay, 60))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._dispatch(self._pop_due(time.time()))
+
+    async def _dispatch(self, due):
+        # Combine reminders per user so a backlog (e.g. after downtime) becomes a few DMs, not hundreds
+        by_user = {}
+        for reminder in due:
+            by_user.setdefault(reminder.user_id, []).append(reminder)
+
+        for user_id, reminders in by_user.items():
+            for start in range(0, len(reminders), self.batch_size):
+                batch = reminders[start:start + self.batch_size]
+                late = batch[0].due_at < self._started_at - self.grace
+                try:
+                    await self.deliver(user_id, batch, late)
+                    self.delivered += len(batch)
+                except Exception as e:
+                    print(f"Reminder delivery error: {str(e)}")
+                self._db.executemany("DELETE FROM reminders WHERE id = ?", [(reminder.id,) for reminder in batch])
+                self._db.commit()
+                await asyncio.sleep(self.send_interval)
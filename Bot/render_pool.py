@@ -0,0 +1,98 @@
+# Render pool
+# Runs CPU-bound image work (template decode, text layout, QR generation, PNG encode) in worker
+# processes so a large render can't stall the gateway loop. Jobs are picklable request objects
+# with a render(max_pixels) method that returns encoded bytes.
+import asyncio, os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Largest image (width * height) any render may produce or decode
+DEFAULT_MAX_PIXELS = 4096 * 4096
+
+
+class RenderError(Exception):
+    """A render request failed."""
+
+
+class RenderTimeout(RenderError):
+    """A render took longer than the pool's timeout."""
+
+
+class RenderTooLarge(RenderError):
+    """A render would exceed the pixel limit."""
+
+
+def check_pixels(width, height, max_pixels):
+    """Raise RenderTooLarge if an image of this size is over the limit."""
+    if width * height > max_pixels:
+        raise RenderTooLarge(f"Image is too large ({width}x{height})")
+
+
+def _init_worker(max_pixels):
+    """Stop Pillow from decoding anything past the pixel limit inside a pool worker."""
+    from PIL import Image
+    Image.MAX_IMAGE_PIXELS = max_pixels
+
+
+def _render_in_worker(request, max_pixels):
+    return request.render(max_pixels)
+
+
+class RenderPool:
+    """
+    Awaitable executor for render requests.
+
+    Args:
+        max_workers: Worker processes (defaults to the host's core count)
+        timeout: Seconds to wait for a render before giving up on it
+        max_pixels: Largest image a render may decode or produce
+        mode: 'process' for a worker pool, 'inline' to render on the event loop (for debugging/benchmarks)
+    """
+
+    def __init__(self, max_workers=None, timeout=10, max_pixels=DEFAULT_MAX_PIXELS, mode='process'):
+        if mode not in ('process', 'inline'):
+            raise ValueError(f"Unknown render pool mode: {mode}")
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.max_pixels = max_pixels
+        self.mode = mode
+        self.timeouts = 0
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.max_pixels,)
+            )
+        return self._executor
+
+    async def render(self, request):
+        """
+        Render a request in the pool.
+
+        Returns:
+            bytes: Encoded image
+        """
+        if self.mode == 'inline':
+            return request.render(self.max_pixels)
+
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self._get_executor(), _render_in_worker, request, self.max_pixels)
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            # The worker finishes the job in the background; its result is dropped
+            self.timeouts += 1
+            raise RenderTimeout(f"Rendering took longer than {self.timeout} seconds")
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool for the next request
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            raise RenderError("Render worker crashed")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,176 @@
+# Response cache for external lookup commands
+# Remembers third-party API results for a per-command TTL, serves slightly stale results
+# while refreshing them in the background, and collapses identical concurrent lookups into one.
+import asyncio, json, sqlite3, time
+from collections import OrderedDict
+
+
+def normalize_key_part(value):
+    """Fold case and whitespace so 'London ' and 'london' share a cache entry."""
+    if isinstance(value, str):
+        return " ".join(value.casefold().split())
+    return value
+
+
+class MemoryBackend:
+    """In-memory LRU storage of (value, stored_at) pairs."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key, value, stored_at):
+        self._entries[key] = (value, stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self.evictions += 1
+            self._evicted(evicted)
+
+    def _evicted(self, key):
+        """Called for each entry the LRU drops."""
+
+    def delete(self, key):
+        self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SqliteBackend(MemoryBackend):
+    """
+    LRU in memory, written through to SQLite so cached lookups survive a restart.
+    Values must be JSON-serializable (tuples come back as lists).
+
+    Args:
+        db_path: SQLite file
+        max_entries: Entries kept, in memory and on disk
+        max_age: Rows older than this are dropped at startup; should cover the longest fresh + stale TTL
+    """
+
+    def __init__(self, db_path, max_entries=1024, max_age=86400):
+        super().__init__(max_entries)
+        self._db = sqlite3.connect(db_path)
+        self._db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, stored_at REAL)")
+        self._db.execute("DELETE FROM responses WHERE stored_at < ?", (time.time() - max_age,))
+        self._db.commit()
+        rows = self._db.execute(
+            "SELECT key, value, stored_at FROM responses ORDER BY stored_at DESC LIMIT ?", (max_entries,)
+        ).fetchall()
+        for key, value, stored_at in reversed(rows):
+            self._entries[key] = (json.loads(value), stored_at)
+
+    def set(self, key, value, stored_at):
+        self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (key, json.dumps(value), stored_at))
+        super().set(key, value, stored_at)
+        self._db.commit()
+
+    def _evicted(self, key):
+        # Keep the table the same size as the LRU instead of growing until the next startup sweep
+        self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def delete(self, key):
+        super().delete(key)
+        self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+
+class ResponseCache:
+    """
+    Async get-or-fetch cache with stale-while-revalidate and request coalescing.
+
+    Args:
+        backend: Storage backend (defaults to an in-memory LRU)
+        ttls: {namespace: (fresh_seconds, stale_seconds)} per-command lifetimes
+    """
+
+    def __init__(self, backend=None, ttls=None):
+        self.backend = backend or MemoryBackend()
+        self.ttls = dict(ttls or {})
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._in_flight = {}
+
+    @staticmethod
+    def make_key(namespace, *parts):
+        return json.dumps([namespace, *parts], ensure_ascii=False)
+
+    def _store(self, key, value, should_cache):
+        if should_cache(value):
+            self.backend.set(key, value, time.time())
+        return value
+
+    def _refresh(self, key, fetch, should_cache):
+        """Start (or join) the upstream fetch for a key."""
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return task
+
+        async def run():
+            try:
+                return self._store(key, await fetch(), should_cache)
+            finally:
+                self._in_flight.pop(key, None)
+
+        task = asyncio.ensure_future(run())
+        self._in_flight[key] = task
+        return task
+
+    def _log_refresh_error(self, task):
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Cache refresh error: {str(task.exception())}")
+
+    async def get_or_fetch(self, namespace, key_parts, fetch, should_cache=lambda value: value is not None):
+        """
+        Return a cached value, or call fetch() to get one.
+
+        Args:
+            namespace: Command name, used to look up the TTL (e.g. 'weather')
+            key_parts: Arguments that identify the request (already normalized by the caller)
+            fetch: Coroutine function returning the value to cache
+            should_cache: Predicate deciding whether a fetched value is worth caching
+        """
+        fresh_ttl, stale_ttl = self.ttls.get(namespace, (300, 0))
+        key = self.make_key(namespace, *key_parts)
+        entry = self.backend.get(key)
+
+        if entry is not None:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age < fresh_ttl:
+                self.hits += 1
+                return value
+            if age < fresh_ttl + stale_ttl:
+                # Serve the stale copy now and refresh it for the next caller
+                self.stale_hits += 1
+                if key not in self._in_flight:
+                    self._refresh(key, fetch, should_cache).add_done_callback(self._log_refresh_error)
+                return value
+            self.backend.delete(key)
+
+        self.misses += 1
+        # Shield so a cancelled caller doesn't abort the fetch others are waiting on
+        return await asyncio.shield(self._refresh(key, fetch, should_cache))
+
+    def stats(self):
+        return {
+            'size': len(self.backend),
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'evictions': self.backend.evictions,
+        }
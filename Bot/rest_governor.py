@@ -0,0 +1,262 @@
+# REST rate-limit governor
+# Paces the bot's own Discord REST calls (poll updates, member edits, reminder DMs) through a token
+# bucket per route plus one global bucket, so bursts queue up here instead of turning into 429s
+# and stalls inside discord.py. Queued calls go out by priority, then in order per route.
+import asyncio, collections, logging, time
+
+import discord
+
+# Priority classes, most urgent first
+URGENT = 0      # A user is waiting on it (e.g. a command's own edits before it responds)
+NORMAL = 1      # Enforcement that should happen promptly (e.g. permamute re-mutes)
+BACKGROUND = 2  # Cosmetic or deferrable work (poll message updates, reminder DMs)
+
+# Route kind -> (requests, per seconds); routes are (kind, major ID) tuples, one bucket each
+DEFAULT_LIMITS = {
+    'reaction': (1, 0.25),      # Per channel
+    'member_edit': (10, 10.0),  # Per guild
+    'dm': (5, 5.0),             # Shared by every DM
+    'message': (5, 5.0),        # Per channel
+}
+FALLBACK_LIMIT = (5, 5.0)
+
+
+class TokenBucket:
+    __slots__ = ('capacity', 'rate', 'tokens', 'updated', 'blocked_until')
+
+    def __init__(self, requests, per):
+        self.capacity = requests
+        self.rate = requests / per
+        self.tokens = float(requests)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def delay(self, now):
+        """Seconds until a request may go out (0 if one may go now)."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(wait, self.blocked_until - now)
+
+    def take(self):
+        self.tokens -= 1
+
+    def idle(self, now):
+        return self.delay(now) == 0 and self.tokens >= self.capacity
+
+
+class _Job:
+    __slots__ = ('route', 'call', 'priority', 'future', 'attempts')
+
+    def __init__(self, route, call, priority, future):
+        self.route = route
+        self.call = call
+        self.priority = priority
+        self.future = future
+        self.attempts = 0
+
+
+class _RateLimitCounter(logging.Handler):
+    """Counts the 429s discord.py retries internally, which it only reports through its log."""
+
+    def __init__(self, governor):
+        super().__init__(logging.WARNING)
+        self.governor = governor
+
+    def emit(self, record):
+        if isinstance(record.msg, str) and record.msg.startswith('We are being rate limited'):
+            self.governor.record_rate_limit()
+
+
+class RestGovernor:
+    """
+    Call start() once the event loop is running and close() on shutdown.
+
+    Args:
+        limits: Route kind -> (requests, per seconds), merged over DEFAULT_LIMITS
+        global_limit: Requests per second across every route (Discord allows 50)
+        max_queue: Background calls that may wait at once; submit() drops new ones beyond that
+        max_retries: Times a call that raised discord.RateLimited is put back in the queue
+    """
+
+    def __init__(self, limits=None, global_limit=45, max_queue=1000, max_retries=2):
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.max_depth = 0
+        self._global = TokenBucket(global_limit, 1.0)
+        self._buckets = {}
+        self._queues = {priority: collections.deque() for priority in (URGENT, NORMAL, BACKGROUND)}
+        self._recent_429s = collections.deque()
+        self._log_handler = _RateLimitCounter(self)
+        self._wakeup = None
+        self._task = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        logging.getLogger('discord.http').addHandler(self._log_handler)
+        self._task = asyncio.ensure_future(self._run())
+
+    async def close(self):
+        logging.getLogger('discord.http').removeHandler(self._log_handler)
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # Waiting callers get a CancelledError; queued background calls are dropped
+        for queue in self._queues.values():
+            while queue:
+                job = queue.popleft()
+                if job.future is not None:
+                    job.future.cancel()
+                else:
+                    self.dropped += 1
+
+    # ---- queueing ----
+    def _enqueue(self, job, front=False):
+        queue = self._queues[job.priority]
+        if front:
+            queue.appendleft(job)
+        else:
+            queue.append(job)
+        self.max_depth = max(self.max_depth, self.depth())
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def call(self, route, func, *args, priority=NORMAL, **kwargs):
+        """
+        Make a REST call once its route and the global budget allow it, and wait for the result.
+
+        Args:
+            route: (kind, major ID) tuple, e.g. ('member_edit', guild.id); the kind picks the limit
+            func: Coroutine function making the call, e.g. member.edit
+            priority: URGENT, NORMAL or BACKGROUND
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(_Job(route, lambda: func(*args, **kwargs), priority, future))
+        return await future
+
+    def submit(self, route, func, *args, priority=BACKGROUND, **kwargs):
+        """
+        Queue a REST call without waiting for it; failures are logged, not raised.
+
+        Returns:
+            bool: False if the queue was full and the call was dropped
+        """
+        if self.depth() >= self.max_queue:
+            self.dropped += 1
+            return False
+        self._enqueue(_Job(route, lambda: func(*args, **kwargs), priority, None))
+        return True
+
+    def depth(self):
+        return sum(len(queue) for queue in self._queues.values())
+
+    # ---- metrics ----
+    def record_rate_limit(self):
+        self.rate_limited += 1
+        self._recent_429s.append(time.monotonic())
+
+    def stats(self):
+        cutoff = time.monotonic() - 60
+        while self._recent_429s and self._recent_429s[0] < cutoff:
+            self._recent_429s.popleft()
+        return {
+            'queued': self.depth(),
+            'queued_urgent': len(self._queues[URGENT]),
+            'queued_normal': len(self._queues[NORMAL]),
+            'queued_background': len(self._queues[BACKGROUND]),
+            'max_depth': self.max_depth,
+            'sent': self.sent,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'retries': self.retries,
+            'rate_limited': self.rate_limited,
+            'rate_limited_last_minute': len(self._recent_429s),
+        }
+
+    # ---- dispatching ----
+    def _bucket(self, route):
+        bucket = self._buckets.get(route)
+        if bucket is None:
+            if len(self._buckets) >= 4096:
+                # Forget routes that have fully refilled; they start over full anyway
+                now = time.monotonic()
+                for key in [key for key, old in self._buckets.items() if old.idle(now)]:
+                    del self._buckets[key]
+            bucket = self._buckets[route] = TokenBucket(*self.limits.get(route[0], FALLBACK_LIMIT))
+        return bucket
+
+    def _release_ready(self):
+        """Start every queued call whose route has a token, most urgent first. Returns seconds until the next one could go."""
+        now = time.monotonic()
+        wait = None
+        for queue in self._queues.values():
+            waiting = collections.deque()
+            blocked = set()
+            while queue:
+                global_delay = self._global.delay(now)
+                if global_delay:
+                    queue.extendleft(reversed(waiting))
+                    return global_delay
+                job = queue.popleft()
+                if job.future is not None and job.future.done():
+                    # The caller gave up (cancelled) before its turn
+                    continue
+                bucket = self._bucket(job.route)
+                delay = bucket.delay(now) if job.route not in blocked else None
+                if delay is None or delay:
+                    # Later calls on this route wait behind this one
+                    if delay:
+                        blocked.add(job.route)
+                        wait = delay if wait is None else min(wait, delay)
+                    waiting.append(job)
+                    continue
+                bucket.take()
+                self._global.take()
+                asyncio.ensure_future(self._send(job))
+            queue.extend(waiting)
+        return wait
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            wait = self._release_ready()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _send(self, job):
+        try:
+            result = await job.call()
+        except discord.RateLimited as e:
+            # Only raised when discord.py is told not to wait out long limits itself
+            self.record_rate_limit()
+            self._bucket(job.route).blocked_until = time.monotonic() + e.retry_after
+            if job.attempts < self.max_retries:
+                job.attempts += 1
+                self.retries += 1
+                self._enqueue(job, front=True)
+                return
+            self._fail(job, e)
+        except Exception as e:
+            self._fail(job, e)
+        else:
+            self.sent += 1
+            if job.future is not None and not job.future.done():
+                job.future.set_result(result)
+
+    def _fail(self, job, error):
+        self.failed += 1
+        if job.future is None:
+            print(f"REST call error ({job.route[0]}): {str(error)}")
+        elif not job.future.done():
+            job.future.set_exception(error)
@@ -0,0 +1,72 @@
+# Google Custom Search client
+# Talks to the Custom Search JSON API over the shared aiohttp session instead of building a
+# googleapiclient discovery service per query and running its blocking execute() on the loop.
+from response_cache import normalize_key_part
+
+ENDPOINT = "https://www.googleapis.com/customsearch/v1"
+# The API never returns results past the 100th
+MAX_RESULTS = 100
+
+
+class SearchError(Exception):
+    """The Custom Search API returned an error."""
+
+
+class SearchService:
+    """
+    Paged, cached Custom Search lookups.
+
+    Args:
+        http_client: Shared HttpClient
+        api_key: Google API key
+        cse_id: Programmable Search Engine ID
+        cache: Optional ResponseCache (results are cached under the 'search' namespace)
+        page_size: Results per page (the API allows up to 10)
+    """
+
+    def __init__(self, http_client, api_key, cse_id, cache=None, page_size=3):
+        self.http_client = http_client
+        self.api_key = api_key
+        self.cse_id = cse_id
+        self.cache = cache
+        self.page_size = page_size
+
+    def max_page(self, total):
+        """Index of the last page we can fetch for a result count."""
+        total = min(total, MAX_RESULTS)
+        return max(0, (total - 1) // self.page_size)
+
+    async def _fetch(self, query, page):
+        params = {
+            "key": self.api_key,
+            "cx": self.cse_id,
+            "q": query,
+            "num": self.page_size,
+            "start": page * self.page_size + 1,
+        }
+        status, data = await self.http_client.get_json(ENDPOINT, params=params)
+        if status != 200:
+            message = ((data or {}).get('error') or {}).get('message', f"HTTP {status}")
+            raise SearchError(message)
+
+        return {
+            'items': [
+                {'title': item.get('title', ''), 'snippet': item.get('snippet', ''), 'link': item.get('link', '')}
+                for item in data.get('items', [])
+            ],
+            'total': int(data.get('searchInformation', {}).get('totalResults', 0) or 0),
+        }
+
+    async def search(self, query, page=0):
+        """
+        Fetch one page of results.
+
+        Returns:
+            dict: {'items': [{'title', 'snippet', 'link'}, ...], 'total': estimated result count}
+        """
+        if self.cache is None:
+            return await self._fetch(query, page)
+        return await self.cache.get_or_fetch(
+            'search', [normalize_key_part(query), page, self.page_size],
+            lambda: self._fetch(query, page)
+        )
@@ -0,0 +1,92 @@
+# Sharding helpers
+# Describes which gateway shards this process runs, so the bot can be split across several
+# processes, and which guilds (and therefore which stored state) each process is responsible for.
+import discord
+from discord.ext import commands
+
+
+def shard_for_guild(guild_id, shard_count):
+    """Shard a guild's events arrive on (Discord's (guild_id >> 22) % shard_count formula)."""
+    return (guild_id >> 22) % shard_count
+
+
+def parse_shard_ids(value):
+    """
+    Accept shard IDs as a list/range, or a string like "0-3,8" (handy in environment variables).
+
+    Returns:
+        list or None: Sorted shard IDs, or None when value is empty
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        shard_ids = set()
+        for part in value.split(','):
+            part = part.strip()
+            if '-' in part:
+                start, end = part.split('-', 1)
+                shard_ids.update(range(int(start), int(end) + 1))
+            elif part:
+                shard_ids.add(int(part))
+        return sorted(shard_ids)
+    return sorted(set(value))
+
+
+def command_scope(guild_ids):
+    """
+    Keyword arguments for tree.command(): register in each listed guild, or globally for None.
+    """
+    if guild_ids is None:
+        return {}
+    return {'guilds': [discord.Object(id=guild_id) for guild_id in guild_ids]}
+
+
+class ShardPlan:
+    """
+    Args:
+        enabled: Run an AutoShardedBot instead of a single-connection Bot
+        shard_count: Total shards across every process (None lets Discord pick; single process only)
+        shard_ids: Shards this process runs (None for all of them)
+    """
+
+    def __init__(self, enabled=False, shard_count=None, shard_ids=None):
+        if shard_ids is not None and not enabled:
+            raise ValueError("SHARD_IDS needs SHARDING = True")
+        if shard_ids is not None and shard_count is None:
+            raise ValueError("SHARD_IDS needs SHARD_COUNT so guilds can be mapped to shards")
+        if shard_ids is not None and any(not 0 <= shard_id < shard_count for shard_id in shard_ids):
+            raise ValueError(f"SHARD_IDS must be between 0 and {shard_count - 1}")
+        self.enabled = enabled
+        self.shard_count = shard_count
+        self.shard_ids = frozenset(shard_ids) if shard_ids is not None else None
+
+    @property
+    def client_class(self):
+        return commands.AutoShardedBot if self.enabled else commands.Bot
+
+    def client_kwargs(self):
+        if not self.enabled:
+            return {}
+        kwargs = {'shard_count': self.shard_count}
+        if self.shard_ids is not None:
+            kwargs['shard_ids'] = sorted(self.shard_ids)
+        return kwargs
+
+    def owns(self, guild_id):
+        """True if this process handles a guild (DM-only state belongs to the process running shard 0)."""
+        if self.shard_ids is None:
+            return True
+        if guild_id is None:
+            return 0 in self.shard_ids
+        return shard_for_guild(guild_id, self.shard_count) in self.shard_ids
+
+    @property
+    def is_primary(self):
+        """The process that does once-per-bot work, like syncing slash commands."""
+        return self.shard_ids is None or 0 in self.shard_ids
+
+    def describe(self):
+        if not self.enabled:
+            return "unsharded"
+        shards = "all" if self.shard_ids is None else ",".join(str(shard_id) for shard_id in sorted(self.shard_ids))
+        return f"shards {shards} of {self.shard_count or 'auto'}"
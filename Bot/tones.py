@@ -0,0 +1,65 @@
+# Tone synthesis
+# Builds the /screechkick screech (and other layered tones) with NumPy in one pass, directly at
+# Discord's 48kHz stereo format, and caches the rendered PCM per set of parameters.
+# NumPy is imported when a tone is first rendered.
+import wave
+from functools import lru_cache
+
+# Discord voice PCM format: 48kHz, 16-bit signed little-endian, stereo
+SAMPLE_RATE = 48000
+CHANNELS = 2
+
+# Harsh high-frequency tones as (frequency Hz, level) pairs
+SCREECH_TONES = ((3000, 0.3), (5500, 0.25), (8000, 0.2))
+
+
+def synthesize(duration=2.5, tones=SCREECH_TONES, siren=1200, wobble_rate=10, wobble_depth=0.5, siren_level=0.25,
+               sample_rate=SAMPLE_RATE):
+    """
+    Layer steady tones with a wobbling siren.
+
+    Args:
+        duration: Length in seconds
+        tones: (frequency, level) pairs of steady sine tones
+        siren: Base frequency of the siren (0 to leave it out)
+        wobble_rate: How many times a second the siren's pitch swings
+        wobble_depth: How far the siren's pitch swings, as a fraction of its base frequency
+        siren_level: Siren volume
+        sample_rate: Samples per second
+
+    Returns:
+        numpy.ndarray: Mono float samples clipped to [-1, 1]
+    """
+    import numpy as np
+    t = np.arange(int(duration * sample_rate), dtype=np.float64) / sample_rate
+    samples = np.zeros_like(t)
+    for frequency, level in tones:
+        samples += np.sin(2 * np.pi * frequency * t) * level
+    if siren:
+        samples += np.sin(2 * np.pi * siren * t * (1 + wobble_depth * np.sin(2 * np.pi * wobble_rate * t))) * siren_level
+    return np.clip(samples, -1.0, 1.0)
+
+
+def to_pcm16(samples, channels=CHANNELS):
+    """Convert mono float samples to interleaved 16-bit PCM bytes."""
+    pcm = (samples * 32767).astype('<i2')
+    if channels > 1:
+        pcm = pcm.repeat(channels)
+    return pcm.tobytes()
+
+
+@lru_cache(maxsize=16)
+def tone_pcm(duration=2.5, tones=SCREECH_TONES, siren=1200, wobble_rate=10, wobble_depth=0.5, siren_level=0.25):
+    """48kHz stereo PCM for a tone, rendered once per set of parameters (see synthesize for the arguments)."""
+    return to_pcm16(synthesize(duration, tones, siren, wobble_rate, wobble_depth, siren_level))
+
+
+def write_wav(path, pcm, sample_rate=SAMPLE_RATE, channels=CHANNELS):
+    """Write 16-bit PCM bytes to a WAV file in a single call."""
+    with wave.open(path, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm)
+    return path
+
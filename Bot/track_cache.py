@@ -0,0 +1,234 @@
+# Resolved-track cache
+# Keeps yt-dlp results (title, duration, page URL, direct stream URL) so popular tracks
+# aren't re-extracted every time they're queued. Entries live until their stream URL expires.
+import re, sqlite3, time
+from collections import OrderedDict
+from urllib.parse import urlparse, parse_qs
+
+# Fallback lifetime for stream URLs that don't carry an expire= parameter
+DEFAULT_TTL = 3600
+# Treat entries as expired a little early so FFmpeg never gets a dead URL
+EXPIRY_MARGIN = 300
+
+_YOUTUBE_ID = re.compile(
+    r'(?:youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|embed/|live/)|youtu\.be/)([A-Za-z0-9_-]{11})'
+)
+
+
+class CachedTrack:
+    """A resolved track: stable metadata plus a short-lived direct stream URL and its audio codec."""
+    __slots__ = ('video_id', 'title', 'duration', 'webpage_url', 'stream_url', 'expires_at', 'acodec')
+
+    def __init__(self, video_id, title, duration, webpage_url, stream_url, expires_at, acodec=None):
+        self.video_id = video_id
+        self.title = title
+        self.duration = duration
+        self.webpage_url = webpage_url
+        self.stream_url = stream_url
+        self.expires_at = expires_at
+        self.acodec = acodec
+
+    @classmethod
+    def from_info(cls, info):
+        """Build a track from a single yt-dlp info dict (not a playlist)."""
+        stream_url = info['url']
+        acodec = info.get('acodec')
+        return cls(
+            video_id=track_id(info),
+            title=info.get('title', 'Unknown'),
+            duration=int(info.get('duration') or 0),
+            webpage_url=info.get('webpage_url') or info.get('original_url') or stream_url,
+            stream_url=stream_url,
+            expires_at=stream_expiry(stream_url),
+            # yt-dlp reports 'none' for video-only formats and leaves it out when it doesn't know
+            acodec=acodec if acodec and acodec != 'none' else None
+        )
+
+    def ttl(self, now=None):
+        """Seconds until the stream URL should no longer be used."""
+        return self.expires_at - EXPIRY_MARGIN - (now or time.time())
+
+    def is_fresh(self, now=None):
+        return self.ttl(now) > 0
+
+
+def track_id(info):
+    """Stable cache id for an info dict, e.g. 'youtube:dQw4w9WgXcQ'."""
+    return f"{info.get('extractor_key', 'generic').lower()}:{info['id']}"
+
+
+def stream_expiry(stream_url, now=None):
+    """Read the expire= timestamp from a googlevideo URL, or fall back to DEFAULT_TTL."""
+    now = now or time.time()
+    try:
+        expire = parse_qs(urlparse(stream_url).query).get('expire')
+        if expire:
+            return int(expire[0])
+    except ValueError:
+        pass
+    # Some formats put parameters in the path (/expire/1700000000/...)
+    match = re.search(r'/expire/(\d+)', stream_url)
+    if match:
+        return int(match.group(1))
+    return int(now + DEFAULT_TTL)
+
+
+def normalize_query(query):
+    """
+    Normalize a /play query into a cache key.
+    YouTube URLs collapse to their video id; search terms are case and whitespace folded.
+    """
+    query = query.strip()
+    match = _YOUTUBE_ID.search(query)
+    if match:
+        return f"youtube:{match.group(1)}"
+    if query.startswith(('http://', 'https://')):
+        return query
+    return " ".join(query.lower().split())
+
+
+class TrackCache:
+    """
+    LRU cache of CachedTrack entries keyed by video id, with query aliases.
+
+    Args:
+        max_entries: Max tracks kept in memory
+        db_path: Optional SQLite file so the cache survives restarts
+    """
+
+    def __init__(self, max_entries=512, db_path=None):
+        self.max_entries = max_entries
+        self._tracks = OrderedDict()
+        self._aliases = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._db = None
+        if db_path:
+            self._open_db(db_path)
+
+    # ---- persistence ----
+    def _open_db(self, db_path):
+        self._db = sqlite3.connect(db_path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS tracks (video_id TEXT PRIMARY KEY, title TEXT, duration INTEGER, "
+            "webpage_url TEXT, stream_url TEXT, expires_at INTEGER)"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS aliases (query TEXT PRIMARY KEY, video_id TEXT)")
+        # Caches written before the codec was stored lack the column
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(tracks)")}
+        if 'acodec' not in columns:
+            self._db.execute("ALTER TABLE tracks ADD COLUMN acodec TEXT")
+        now = time.time()
+        self._db.execute("DELETE FROM tracks WHERE expires_at - ? < ?", (EXPIRY_MARGIN, now))
+        self._db.execute("DELETE FROM aliases WHERE video_id NOT IN (SELECT video_id FROM tracks)")
+        self._db.commit()
+
+        # Warm the in-memory LRU with the longest-lived entries
+        rows = self._db.execute(
+            "SELECT video_id, title, duration, webpage_url, stream_url, expires_at, acodec FROM tracks "
+            "ORDER BY expires_at DESC LIMIT ?", (self.max_entries,)
+        ).fetchall()
+        for row in reversed(rows):
+            self._tracks[row[0]] = CachedTrack(*row)
+        for query, video_id in self._db.execute("SELECT query, video_id FROM aliases"):
+            if video_id in self._tracks:
+                self._aliases[query] = video_id
+
+    def _persist(self, track, aliases):
+        if self._db is None:
+            return
+        self._db.execute(
+            "INSERT OR REPLACE INTO tracks (video_id, title, duration, webpage_url, stream_url, expires_at, acodec) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (track.video_id, track.title, track.duration, track.webpage_url, track.stream_url, track.expires_at, track.acodec)
+        )
+        self._db.executemany(
+            "INSERT OR REPLACE INTO aliases VALUES (?, ?)",
+            [(alias, track.video_id) for alias in aliases]
+        )
+        self._db.commit()
+
+    def _unpersist(self, video_id):
+        if self._db is None:
+            return
+        self._db.execute("DELETE FROM tracks WHERE video_id = ?", (video_id,))
+        self._db.execute("DELETE FROM aliases WHERE video_id = ?", (video_id,))
+        self._db.commit()
+
+    # ---- cache API ----
+    def _resolve_id(self, query):
+        if query in self._tracks:
+            return query
+        key = normalize_query(query)
+        return self._aliases.get(key, key)
+
+    def _drop(self, video_id):
+        if self._tracks.pop(video_id, None) is not None:
+            self._unpersist(video_id)
+
+    def get(self, query):
+        """
+        Look up a fresh track by query, URL or video id.
+
+        Returns:
+            CachedTrack or None
+        """
+        video_id = self._resolve_id(query)
+        track = self._tracks.get(video_id)
+        if track is None:
+            self.misses += 1
+            return None
+        if not track.is_fresh():
+            self.expirations += 1
+            self.misses += 1
+            self._drop(video_id)
+            return None
+        self._tracks.move_to_end(video_id)
+        self.hits += 1
+        return track
+
+    def put(self, track, *queries):
+        """Store a track and remember which queries resolved to it."""
+        aliases = {normalize_query(q) for q in queries} | {normalize_query(track.webpage_url)}
+        aliases.discard(track.video_id)
+
+        self._tracks[track.video_id] = track
+        self._tracks.move_to_end(track.video_id)
+        for alias in aliases:
+            self._aliases[alias] = track.video_id
+            self._aliases.move_to_end(alias)
+
+        while len(self._tracks) > self.max_entries:
+            old_id, _ = self._tracks.popitem(last=False)
+            self.evictions += 1
+            self._unpersist(old_id)
+        # Aliases are cheap but still bounded; stale ones just miss
+        while len(self._aliases) > self.max_entries * 4:
+            self._aliases.popitem(last=False)
+
+        self._persist(track, aliases)
+        return track
+
+    def discard(self, query):
+        """Drop a track (e.g. when its stream URL turned out to be dead)."""
+        self._drop(self._resolve_id(query))
+
+    def stats(self):
+        """Counters for monitoring."""
+        return {
+            'size': len(self._tracks),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __len__(self):
+        return len(self._tracks)
@@ -0,0 +1,200 @@
+# Translation service
+# Runs deep_translator off the event loop, reuses one translator per target language,
+# caches (text, target) pairs and merges requests that arrive together into one upstream call.
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+# Google's per-request limit is 5000 characters; leave headroom for the separators
+MAX_BATCH_CHARS = 4500
+SEPARATOR = "\n"
+
+
+class TranslationService:
+    """
+    Args:
+        max_workers: Threads used for upstream calls
+        cache_size: (text, target) pairs kept in the LRU
+        batch_window: Seconds to wait for more requests to the same language before sending
+        max_batch: Send immediately once this many texts are waiting for one language
+        metrics: Optional Metrics that times each batch as upstream calls to Google Translate
+    """
+
+    def __init__(self, max_workers=2, cache_size=2048, batch_window=0.05, max_batch=20, metrics=None):
+        self.cache_size = cache_size
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.metrics = metrics
+        self.upstream_calls = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="translate")
+        self._translators = {}
+        self._locks = {}
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._timers = {}
+
+    def _translator(self, target):
+        translator = self._translators.get(target)
+        if translator is None:
+            # Imported on the first translation rather than at startup
+            from deep_translator import GoogleTranslator
+            translator = self._translators[target] = GoogleTranslator(source='auto', target=target)
+        return translator
+
+    def _cache_get(self, text, target):
+        key = (text, target)
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+        return result
+
+    def _cache_put(self, text, target, result):
+        self._cache[(text, target)] = result
+        self._cache.move_to_end((text, target))
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    # ---- upstream (runs on the executor) ----
+    def _chunks(self, texts):
+        """Group single-line texts into joined chunks under the size limit; multi-line texts go alone."""
+        chunk, size = [], 0
+        for text in texts:
+            if SEPARATOR in text or len(text) > MAX_BATCH_CHARS:
+                yield [text]
+                continue
+            if chunk and size + len(text) + len(SEPARATOR) > MAX_BATCH_CHARS:
+                yield chunk
+                chunk, size = [], 0
+            chunk.append(text)
+            size += len(text) + len(SEPARATOR)
+        if chunk:
+            yield chunk
+
+    def _translate_sync(self, target, texts):
+        """
+        Returns:
+            tuple: ({text: translation}, {text: exception}) - a text that fails doesn't fail the rest of its batch
+        """
+        translator = self._translator(target)
+        results, errors = {}, {}
+
+        def translate_one(text):
+            self.upstream_calls += 1
+            try:
+                results[text] = translator.translate(text)
+            except Exception as e:
+                errors[text] = e
+
+        for chunk in self._chunks(texts):
+            if len(chunk) == 1:
+                translate_one(chunk[0])
+                continue
+            self.upstream_calls += 1
+            try:
+                translated = (translator.translate(SEPARATOR.join(chunk)) or "").split(SEPARATOR)
+            except Exception:
+                translated = None
+            if translated is not None and len(translated) == len(chunk):
+                results.update(zip(chunk, translated))
+            else:
+                # The joined call failed or its line structure didn't survive; fall back to one call per text
+                for text in chunk:
+                    translate_one(text)
+        return results, errors
+
+    # ---- batching ----
+    def _schedule_flush(self, target):
+        if len(self._pending[target]) >= self.max_batch:
+            timer = self._timers.pop(target, None)
+            if timer is not None:
+                timer.cancel()
+            asyncio.ensure_future(self._flush(target))
+        elif target not in self._timers:
+            loop = asyncio.get_running_loop()
+            self._timers[target] = loop.call_later(
+                self.batch_window, lambda: asyncio.ensure_future(self._flush(target))
+            )
+
+    async def _flush(self, target):
+        self._timers.pop(target, None)
+        batch = self._pending.pop(target, {})
+        if not batch:
+            return
+
+        lock = self._locks.setdefault(target, asyncio.Lock())
+        # One batch per language at a time, since a translator instance isn't thread-safe
+        async with lock:
+            loop = asyncio.get_running_loop()
+            try:
+                with self.metrics.time_upstream('translate.google.com') if self.metrics is not None else nullcontext():
+                    results, errors = await loop.run_in_executor(self._executor, self._translate_sync, target, list(batch))
+            except Exception as e:
+                for futures in batch.values():
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(e)
+                return
+
+        for text, futures in batch.items():
+            error = errors.get(text)
+            if error is not None:
+                # Only the callers who asked for this text see its error
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            result = results.get(text)
+            if result:
+                self._cache_put(text, target, result)
+            for future in futures:
+                if not future.done():
+                    future.set_result(result)
+
+    def _submit(self, text, target):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(target, {}).setdefault(text, []).append(future)
+        self._schedule_flush(target)
+        return future
+
+    # ---- public API ----
+    async def translate(self, text, target):
+        """
+        Translate one text into a target language code (e.g. 'es').
+
+        Returns:
+            str: Translated text (or None if the upstream returned nothing)
+        """
+        cached = self._cache_get(text, target)
+        if cached is not None:
+            return cached
+        return await self._submit(text, target)
+
+    async def translate_many(self, texts, target):
+        """
+        Translate several texts (e.g. every message in a thread) in as few upstream calls as possible.
+
+        Returns:
+            list: Translations in the same order as texts
+        """
+        results = [self._cache_get(text, target) for text in texts]
+        futures = {
+            index: self._submit(text, target)
+            for index, (text, result) in enumerate(zip(texts, results))
+            if result is None
+        }
+        if futures:
+            # Don't wait out the batch window; everything for this call is already queued
+            timer = self._timers.pop(target, None)
+            if timer is not None:
+                timer.cancel()
+            asyncio.ensure_future(self._flush(target))
+            for index, future in futures.items():
+                results[index] = await future
+        return results
+
+    def stats(self):
+        return {'cached': len(self._cache), 'upstream_calls': self.upstream_calls}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,243 @@
+# Voice session manager
+# Owns the bot's one voice connection per guild: connecting (with retries and backoff), moving
+# between channels, and disconnecting when a session goes idle or its channel empties out.
+# Commands borrow the session instead of calling channel.connect() themselves.
+import asyncio, time
+
+import discord
+
+
+class VoiceSessionError(Exception):
+    """Couldn't get a usable voice connection."""
+
+
+class VoiceBusy(VoiceSessionError):
+    """The guild's voice connection is already playing something."""
+
+
+class VoiceSession:
+    """One guild's voice connection and the commands currently using it."""
+
+    def __init__(self, guild_id):
+        self.guild_id = guild_id
+        self.voice_client = None
+        self.users = set()
+        self.lock = asyncio.Lock()
+        self.last_active = time.monotonic()
+        self.empty_since = None
+
+    @property
+    def connected(self):
+        return self.voice_client is not None and self.voice_client.is_connected()
+
+    @property
+    def busy(self):
+        return self.connected and (self.voice_client.is_playing() or self.voice_client.is_paused())
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+
+class VoiceSessionManager:
+    """
+    Args:
+        on_disconnect: Optional coroutine function called with the guild ID whenever a session ends
+        on_idle: Optional coroutine function called with the guild ID when a play_and_wait() clip ends
+        idle_timeout: Disconnect after this many seconds without playing anything
+        empty_timeout: Disconnect after the channel has had no humans in it for this many seconds
+        connect_attempts: Tries per connect before giving up
+        backoff_base: Seconds to wait after the first failed attempt (doubled after each one)
+        backoff_max: Longest wait between attempts
+        connect_timeout: Seconds to wait for a single voice handshake
+        check_interval: Seconds between idle checks
+    """
+
+    def __init__(self, on_disconnect=None, on_idle=None, idle_timeout=300, empty_timeout=60, connect_attempts=3,
+                 backoff_base=1.0, backoff_max=30.0, connect_timeout=30.0, check_interval=15):
+        self.on_disconnect = on_disconnect
+        self.on_idle = on_idle
+        self.idle_timeout = idle_timeout
+        self.empty_timeout = empty_timeout
+        self.connect_attempts = connect_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.connect_timeout = connect_timeout
+        self.check_interval = check_interval
+        self.connects = 0
+        self.retries = 0
+        self.idle_disconnects = 0
+        self._sessions = {}
+        self._reaper = None
+
+    def start(self):
+        if self._reaper is None:
+            self._reaper = asyncio.ensure_future(self._reap_loop())
+
+    async def close(self):
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        for guild_id in list(self._sessions):
+            await self.disconnect(guild_id)
+
+    # ---- lookups ----
+    def get(self, guild_id):
+        return self._sessions.get(guild_id)
+
+    def voice_client(self, guild_id):
+        """The guild's connected VoiceClient, or None."""
+        session = self._sessions.get(guild_id)
+        return session.voice_client if session is not None and session.connected else None
+
+    def session_count(self):
+        return sum(1 for session in self._sessions.values() if session.connected)
+
+    def stats(self):
+        return {
+            'sessions': self.session_count(),
+            'connects': self.connects,
+            'retries': self.retries,
+            'idle_disconnects': self.idle_disconnects,
+        }
+
+    # ---- connecting ----
+    async def _connect(self, channel):
+        delay = self.backoff_base
+        error = None
+        for attempt in range(self.connect_attempts):
+            # A failed handshake can leave a half-open client behind that blocks the next connect()
+            stale = channel.guild.voice_client
+            if stale is not None and not stale.is_connected():
+                await stale.disconnect(force=True)
+            try:
+                voice_client = await channel.connect(timeout=self.connect_timeout, reconnect=True)
+                self.connects += 1
+                return voice_client
+            except discord.ClientException:
+                # Already connected through a client we lost track of; adopt it
+                voice_client = channel.guild.voice_client
+                if voice_client is None:
+                    raise
+                if voice_client.channel != channel:
+                    await voice_client.move_to(channel)
+                return voice_client
+            except (asyncio.TimeoutError, discord.ConnectionClosed, OSError) as e:
+                error = e
+                if attempt + 1 < self.connect_attempts:
+                    self.retries += 1
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.backoff_max)
+        raise VoiceSessionError(f"Couldn't connect to {channel.name}: {str(error) or type(error).__name__}")
+
+    async def acquire(self, channel, user, exclusive=False):
+        """
+        Get a voice connection in a channel for a command, connecting or moving as needed.
+        An idle connection in another channel is moved; a busy one stays where it is.
+
+        Args:
+            channel: Voice channel the caller wants the bot in
+            user: Name of the borrowing feature (e.g. 'music'); the session stays up while any user holds it
+            exclusive: Raise VoiceBusy instead of sharing a connection that's already playing
+
+        Returns:
+            discord.VoiceClient
+        """
+        guild_id = channel.guild.id
+        session = self._sessions.get(guild_id)
+        if session is None:
+            session = self._sessions[guild_id] = VoiceSession(guild_id)
+
+        async with session.lock:
+            if exclusive and session.busy:
+                raise VoiceBusy("I'm already playing something in this server")
+
+            if not session.connected:
+                try:
+                    session.voice_client = await self._connect(channel)
+                except Exception:
+                    # Don't leave an unconnected session behind for the reaper to "disconnect"
+                    if not session.users and self._sessions.get(guild_id) is session:
+                        del self._sessions[guild_id]
+                    raise
+            elif session.voice_client.channel != channel and not session.busy:
+                await session.voice_client.move_to(channel)
+
+            session.users.add(user)
+            session.empty_since = None
+            session.touch()
+            return session.voice_client
+
+    async def release(self, guild_id, user):
+        """Stop using a session; it disconnects once nobody holds it and nothing is playing."""
+        session = self._sessions.get(guild_id)
+        if session is None:
+            return
+        session.users.discard(user)
+        if not session.users and not session.busy:
+            await self.disconnect(guild_id)
+
+    async def disconnect(self, guild_id):
+        """Tear down a guild's session regardless of who holds it."""
+        session = self._sessions.pop(guild_id, None)
+        if session is None:
+            return
+        if session.voice_client is not None:
+            try:
+                await session.voice_client.disconnect(force=True)
+            except Exception as e:
+                print(f"Voice disconnect error: {str(e)}")
+        if self.on_disconnect is not None:
+            try:
+                await self.on_disconnect(guild_id)
+            except Exception as e:
+                print(f"Voice disconnect handler error: {str(e)}")
+
+    async def play_and_wait(self, voice_client, source):
+        """Play a source and wait for it to finish, without polling is_playing()."""
+        loop = asyncio.get_running_loop()
+        finished = asyncio.Event()
+        try:
+            voice_client.play(source, after=lambda error: loop.call_soon_threadsafe(finished.set))
+            await finished.wait()
+        finally:
+            # Songs queued while the clip held the connection have nobody else to start them
+            if self.on_idle is not None:
+                try:
+                    await self.on_idle(voice_client.guild.id)
+                except Exception as e:
+                    print(f"Voice idle handler error: {str(e)}")
+
+    # ---- housekeeping ----
+    async def handle_voice_state(self, member, before, after):
+        """Keep sessions in step with voice state changes (call from on_voice_state_update)."""
+        session = self._sessions.get(member.guild.id)
+        if session is None:
+            return
+        if member.id == member.guild.me.id and after.channel is None:
+            # Kicked from voice or the connection was dropped for good: forget the session
+            await self.disconnect(member.guild.id)
+        elif session.connected and before.channel == session.voice_client.channel:
+            # Someone left our channel; the reaper disconnects if it stays empty
+            if not any(not m.bot for m in session.voice_client.channel.members):
+                session.empty_since = session.empty_since or time.monotonic()
+        elif session.connected and after.channel == session.voice_client.channel and not member.bot:
+            session.empty_since = None
+
+    async def _reap_loop(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            now = time.monotonic()
+            for guild_id, session in list(self._sessions.items()):
+                if session.lock.locked():
+                    # acquire() is connecting or moving it (possibly backing off between attempts)
+                    continue
+                if not session.connected:
+                    # The voice client gave up reconnecting on its own
+                    await self.disconnect(guild_id)
+                    continue
+                if session.busy:
+                    session.touch()
+                empty = session.empty_since is not None and now - session.empty_since > self.empty_timeout
+                if empty or now - session.last_active > self.idle_timeout:
+                    self.idle_disconnects += 1
+                    await self.disconnect(guild_id)
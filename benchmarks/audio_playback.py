@@ -0,0 +1,88 @@
+# In-memory audio vs. FFmpeg
+# Plays the /screechkick clip through each audio source the way the voice player does (read a frame,
+# Opus-encode it unless the source is already Opus) and reports time-to-first-audio and CPU per play.
+# Paths whose dependencies are missing (ffmpeg binary, libopus) are reported as skipped.
+#
+# Usage: python benchmarks/audio_playback.py [--plays 20]
+import argparse, os, resource, shutil, sys, tempfile, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Bot'))
+
+import discord
+
+from audio_sources import SAMPLES_PER_FRAME, PCMBufferAudio, OpusFramesAudio, encode_opus
+from tones import tone_pcm, write_wav
+
+
+def opus_available():
+    try:
+        discord.opus.Encoder()
+        return True
+    except discord.opus.OpusNotLoaded:
+        return False
+
+
+def cpu_seconds():
+    """CPU used by this process and its finished children (FFmpeg), user + system."""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def play(make_source, encoder):
+    """Drain a source like discord's AudioPlayer; returns (seconds to first frame, CPU seconds)."""
+    cpu_start = cpu_seconds()
+    start = time.perf_counter()
+    source = make_source()
+    first = None
+    while True:
+        data = source.read()
+        if not data:
+            break
+        if first is None:
+            first = time.perf_counter() - start
+        if encoder is not None and not source.is_opus():
+            encoder.encode(data, SAMPLES_PER_FRAME)
+    source.cleanup()
+    return first, cpu_seconds() - cpu_start
+
+
+def report(label, results):
+    firsts = sorted(first for first, _ in results)
+    cpu = sum(used for _, used in results) / len(results)
+    print(f"{label:>14}: first audio median {firsts[len(firsts) // 2] * 1000:8.2f} ms | CPU per play {cpu * 1000:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--plays', type=int, default=20)
+    args = parser.parse_args()
+
+    pcm = tone_pcm()
+    has_opus = opus_available()
+    encoder = discord.opus.Encoder() if has_opus else None
+    if not has_opus:
+        print("libopus not found: Opus encoding is left out of every path and the Opus-frames path is skipped")
+
+    ffmpeg = shutil.which("ffmpeg")
+    with tempfile.TemporaryDirectory() as tmp:
+        wav_path = write_wav(os.path.join(tmp, "screech.wav"), pcm)
+
+        if ffmpeg:
+            report("ffmpeg", [play(lambda: discord.FFmpegPCMAudio(wav_path, executable=ffmpeg), encoder) for _ in range(args.plays)])
+        else:
+            print(f"{'ffmpeg':>14}: skipped (ffmpeg not found)")
+
+        report("pcm buffer", [play(lambda: PCMBufferAudio(pcm), encoder) for _ in range(args.plays)])
+
+        if has_opus:
+            start = time.perf_counter()
+            frames = encode_opus(pcm)
+            print(f"{'':>14}  (one-time Opus pre-encode: {(time.perf_counter() - start) * 1000:.2f} ms)")
+            report("opus frames", [play(lambda: OpusFramesAudio(frames), encoder) for _ in range(args.plays)])
+        else:
+            print(f"{'opus frames':>14}: skipped (libopus not found)")
+
+
+if __name__ == "__main__":
+    main()
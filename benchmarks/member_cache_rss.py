@@ -0,0 +1,99 @@
+# Member cache memory per gateway profile
+# Builds a guild from a synthetic GUILD_CREATE payload under each gateway profile (in a fresh
+# process each, so allocations don't leak between runs) and reports how much resident memory the
+# cached members cost, scaled to RSS per 10k members. Every member is in the payload, as if the guild
+# had been chunked; the lean profile with /permamute enabled would only get there gradually, as
+# members show up in events.
+#
+# Usage: python benchmarks/member_cache_rss.py [--members 10000] [--voice 50]
+import argparse, gc, json, os, subprocess, sys
+
+BOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Bot')
+sys.path.insert(0, BOT_DIR)
+
+PROFILES = (
+    ('full', ()),
+    ('lean', ()),
+    ('lean', ('permamute',)),
+)
+GUILD_ID = 1 << 40
+CHANNEL_ID = GUILD_ID + 1
+
+
+def rss_kib():
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def guild_payload(members, voice):
+    return {
+        'id': str(GUILD_ID),
+        'name': 'bench',
+        'owner_id': '1',
+        'member_count': members,
+        'roles': [{'id': str(GUILD_ID), 'name': '@everyone', 'permissions': '0', 'position': 0,
+                   'color': 0, 'hoist': False, 'managed': False, 'mentionable': False}],
+        'channels': [{'id': str(CHANNEL_ID), 'type': 2, 'name': 'voice', 'position': 0,
+                      'permission_overwrites': [], 'bitrate': 64000, 'user_limit': 0}],
+        'members': [
+            {'user': {'id': str(user_id), 'username': f'user{user_id}', 'discriminator': '0', 'avatar': None},
+             'roles': [], 'joined_at': '2024-01-01T00:00:00+00:00', 'deaf': False, 'mute': False, 'flags': 0}
+            for user_id in range(1, members + 1)
+        ],
+        'voice_states': [
+            {'user_id': str(user_id), 'channel_id': str(CHANNEL_ID), 'session_id': 'x',
+             'deaf': False, 'mute': False, 'self_deaf': False, 'self_mute': False, 'suppress': False}
+            for user_id in range(1, min(voice, members) + 1)
+        ],
+    }
+
+
+def measure(profile, enabled, members, voice):
+    """Run in a child process: RSS growth from building one guild, and how many members stayed cached."""
+    import discord
+    from gateway_profile import COMMAND_INTENTS, gateway_options
+
+    disabled = set(COMMAND_INTENTS) - set(enabled)
+    client = discord.Client(**gateway_options(profile, disabled))
+    state = client._connection
+    payload = guild_payload(members, voice)
+
+    gc.collect()
+    before = rss_kib()
+    guild = discord.Guild(data=payload, state=state)
+    gc.collect()
+    after = rss_kib()
+    return {'rss_kib': after - before, 'cached': len(guild.members)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--members', type=int, default=10000)
+    parser.add_argument('--voice', type=int, default=50)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        profile, enabled = json.loads(args.child)
+        print(json.dumps(measure(profile, enabled, args.members, args.voice)))
+        return
+
+    print(f"{args.members} members, {args.voice} in voice")
+    for profile, enabled in PROFILES:
+        output = subprocess.run(
+            [sys.executable, __file__, '--members', str(args.members), '--voice', str(args.voice),
+             '--child', json.dumps([profile, list(enabled)])],
+            stdout=subprocess.PIPE, check=True, text=True
+        ).stdout
+        result = json.loads(output)
+        label = profile + (f" +{','.join(enabled)}" if enabled else "")
+        per_10k = result['rss_kib'] * 10000 / args.members / 1024
+        print(f"{label:>16}: {result['cached']:>7} members cached | RSS {result['rss_kib'] / 1024:8.2f} MiB "
+              f"| {per_10k:8.2f} MiB per 10k members")
+
+
+if __name__ == "__main__":
+    main()
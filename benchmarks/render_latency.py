@@ -0,0 +1,88 @@
+# Event-loop latency under render load
+# Fires a burst of concurrent /memegen and /qrcode renders and measures how late a 5 ms ticker
+# wakes up while they run, once rendering inline on the loop and once through the process pool.
+#
+# Usage: python benchmarks/render_latency.py [--renders 32] [--size 2000]
+import argparse, asyncio, os, statistics, sys, time
+from io import BytesIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Bot'))
+
+from PIL import Image
+
+from meme_renderer import MemeRenderRequest
+from qr_renderer import QRCodeRenderRequest
+from render_pool import RenderPool
+
+TICK = 0.005
+
+
+def make_template(size):
+    """Noisy JPEG, so decode and PNG encode cost roughly what a real photo template does."""
+    img = Image.effect_noise((size, size), 64).convert('RGB')
+    output = BytesIO()
+    img.save(output, format='JPEG', quality=90)
+    return output.getvalue()
+
+
+async def ticker(lags, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def run(mode, renders, template):
+    pool = RenderPool(mode=mode, timeout=120)
+    # Start the workers before measuring
+    await pool.render(QRCodeRenderRequest("warm up"))
+
+    requests = []
+    for i in range(renders):
+        if i % 2:
+            requests.append(QRCodeRenderRequest(f"https://example.com/{i}/" + "x" * 1500))
+        else:
+            # A distinct key per job so each worker decodes the template like a cold render would
+            requests.append(MemeRenderRequest(f"bench-{i}", template, f"top text {i}", f"bottom text {i}"))
+
+    lags = []
+    stop = asyncio.Event()
+    tick_task = asyncio.ensure_future(ticker(lags, stop))
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    if mode == 'inline':
+        # Inline renders block the loop; yield between them as the command handlers would
+        for request in requests:
+            await pool.render(request)
+            await asyncio.sleep(0)
+    else:
+        await asyncio.gather(*(pool.render(request) for request in requests))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await tick_task
+    pool.shutdown()
+
+    lags_ms = sorted(lag * 1000 for lag in lags)
+    p99 = lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))]
+    print(
+        f"{mode:>8}: {renders} renders in {elapsed:6.2f}s | loop lag "
+        f"median {statistics.median(lags_ms):7.2f} ms, p99 {p99:7.2f} ms, max {lags_ms[-1]:7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--renders', type=int, default=32)
+    parser.add_argument('--size', type=int, default=2000, help="Template width and height in pixels")
+    args = parser.parse_args()
+
+    template = make_template(args.size)
+    print(f"{os.cpu_count()} cores, {args.size}x{args.size} template ({len(template) // 1024} KiB)")
+    for mode in ('inline', 'process'):
+        asyncio.run(run(mode, args.renders, template))
+
+
+if __name__ == "__main__":
+    main()
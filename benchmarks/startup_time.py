@@ -0,0 +1,116 @@
+# Cold start and import time
+# Starts the bot the way `python bot.py` does, up to the point where it would connect to the
+# gateway (bot.py imported, every enabled command group loaded), in fresh processes under
+# `python -X importtime`, with placeholder credentials and without syncing commands. Reports wall
+# time, the slowest imports, and what each heavy dependency costs on the first command that uses it.
+#
+# Usage: python benchmarks/startup_time.py [--runs 5] [--top 10] [--disable music,images]
+import argparse, os, re, subprocess, sys, tempfile
+
+BOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Bot')
+
+# Imported on first use instead of at startup: (module, what pulls it in)
+DEFERRED = (
+    ('yt_dlp', '/play'),
+    ('replicate', '/imagine'),
+    ('giphy_client', '/gif'),
+    ('PIL.Image', '/memegen, /qrcode (render pool)'),
+    ('qrcode', '/qrcode (render pool)'),
+    ('deep_translator', '/translate'),
+    ('numpy', '/screechkick, /sfx'),
+    ('dateutil.parser', '/countdown'),
+)
+
+STARTUP = '''
+import asyncio, runpy, sys, time
+start = time.perf_counter()
+import discord
+discord.app_commands.CommandTree.sync = lambda self, *args, **kwargs: asyncio.sleep(0, [])
+bot = runpy.run_path({bot_path!r}, run_name='bot')
+client = bot['client']
+
+async def main():
+    await client._async_setup_hook()
+    await client.setup_hook()
+    elapsed = time.perf_counter() - start
+    print(elapsed, len(list(client.tree.walk_commands(guild=discord.Object(id=1)))), len(client.extensions))
+    await client.close()
+
+asyncio.run(main())
+'''
+
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def placeholder_config(directory, disabled):
+    with open(os.path.join(directory, 'config.py'), 'w') as config:
+        config.write(
+            "TOKEN = GIPHY_API_KEY = GOOGLE_API_KEY = GOOGLE_CSE_ID = REPLICATE_API_KEY = OPENWEATHER_API_KEY = 'x'\n"
+            "GUILD_ID = 1\n"
+            "REMINDER_DB_PATH = POLL_DB_PATH = PERMAMUTE_DB_PATH = ':memory:'\n"
+            f"DISABLED_GROUPS = {disabled!r}\n"
+        )
+
+
+def run(code, env, importtime=False):
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    result = subprocess.run(command, cwd=BOT_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
+    return result.stdout, result.stderr
+
+
+def top_level_imports(stderr):
+    """Cumulative import time (ms) of each top-level import, from -X importtime output."""
+    times = {}
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match and len(match.group(3)) == 1:
+            times[match.group(4)] = int(match.group(2)) / 1000
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--disable', default='', help="Comma-separated command groups to leave out")
+    args = parser.parse_args()
+    disabled = [group for group in args.disable.split(',') if group]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        placeholder_config(tmp, disabled)
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([tmp, os.environ.get('PYTHONPATH', '')]))
+        code = STARTUP.format(bot_path=os.path.join(BOT_DIR, 'bot.py'))
+
+        walls = []
+        for _ in range(args.runs):
+            stdout, _ = run(code, env)
+            elapsed, commands, groups = stdout.split()[-3:]
+            walls.append(float(elapsed))
+        walls.sort()
+        print(f"startup to gateway connect: median {walls[len(walls) // 2] * 1000:.0f} ms "
+              f"(min {walls[0] * 1000:.0f} ms) | {groups} groups, {commands} commands"
+              + (f" | disabled: {', '.join(disabled)}" if disabled else ""))
+
+        _, stderr = run(code, env, importtime=True)
+        imports = top_level_imports(stderr)
+        print("\nslowest imports at startup (cumulative, -X importtime):")
+        for module, ms in sorted(imports.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {module:<28} {ms:8.1f} ms")
+
+        print("\ndeferred until first use:")
+        for module, used_by in DEFERRED:
+            if module.split('.')[0] in imports:
+                print(f"  {module:<28} loaded at startup!")
+                continue
+            try:
+                _, stderr = run(f"import discord, aiohttp\nimport {module}", env, importtime=True)
+            except subprocess.CalledProcessError:
+                print(f"  {module:<28} not installed")
+                continue
+            root = module.split('.')[0]
+            cost = sum(ms for name, ms in top_level_imports(stderr).items() if name == root or name.startswith(root + '.'))
+            print(f"  {module:<28} {cost:8.1f} ms  ({used_by})")
+
+
+if __name__ == "__main__":
+    main()